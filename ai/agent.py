@@ -1,62 +1,100 @@
 import random
 import json
 import os
+import threading
+
+
+DELTA_SUFFIX = ".delta"
+COMPACTING_SUFFIX = ".delta.old"
+POSITION_FEATURES = "position"
+UNLEARNED = float('-inf')
+CAPTURE_BONUS = 3
+
+
+def shaped_reward(captured_pieces, became_king, game_over, won):
+    reward = 0
+    
+    for piece in captured_pieces:
+        if piece.is_king:
+            reward += 5
+        else:
+            reward += 3
+    
+    if became_king:
+        reward += 5
+    
+    if game_over:
+        if won:
+            reward += 100
+        else:
+            reward -= 100
+    
+    return reward
+
+
+def position_features(board):
+    mid = board.size // 2
+    counts = []
+    quadrants = {}
+    totals = [0, 0, 0, 0]
+    
+    for color in sorted(board.pieces.keys()):
+        pieces = board.pieces[color]
+        counts.append(len(pieces))
+        counts.append(sum(1 for p in pieces if p.is_king))
+        
+        quadrant = [0, 0, 0, 0]
+        for piece in pieces:
+            idx = (2 if piece.row >= mid else 0) + (1 if piece.col >= mid else 0)
+            quadrant[idx] += 1
+            totals[idx] += 1
+        quadrants[color] = quadrant
+    
+    return tuple(counts), quadrants, totals
 
 
 class LearningAgent:
     
-    def __init__(self, color, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.2):
+    def __init__(self, color, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.2,
+                 compaction_ratio=0.5, min_compaction_entries=10000, value_table=None):
         self.color = color
-        self.value_table = {}
+        self.value_table = value_table if value_table is not None else {}
+        self.persistent_table = hasattr(self.value_table, "flush")
+        self.indexed_table = hasattr(self.value_table, "state_items")
+        self.tracks_changes = isinstance(self.value_table, dict)
+        self.caches_best = self.tracks_changes
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
         self.exploration_rate = exploration_rate
+        self.rng = random
         self.last_state = None
         self.last_action = None
+        self.dirty_keys = set()
+        self.compaction_ratio = compaction_ratio
+        self.min_compaction_entries = min_compaction_entries
+        self._persist_path = None
+        self._delta_entries = 0
+        self._compactor = None
+        self._rebuild_best_actions()
     
     def get_state_key(self, board):
-        piece_counts = {}
-        king_counts = {}
-        
-        for color, pieces in board.pieces.items():
-            piece_counts[color] = len(pieces)
-            king_counts[color] = sum(1 for p in pieces if p.is_king)
-        
-        state = []
-        for color in sorted(board.pieces.keys()):
-            state.append(piece_counts.get(color, 0))
-            state.append(king_counts.get(color, 0))
-        
-        regions = self._get_board_regions(board)
-        state.extend(regions)
-        
-        return tuple(state)
-    
-    def _get_board_regions(self, board):
-        size = board.size
-        mid = size // 2
-        
-        regions = [0, 0, 0, 0]
-        
-        for color, pieces in board.pieces.items():
-            for piece in pieces:
-                if piece.row < mid:
-                    if piece.col < mid:
-                        idx = 0
-                    else:
-                        idx = 1
-                else:
-                    if piece.col < mid:
-                        idx = 2
-                    else:
-                        idx = 3
-                
-                if color == self.color:
-                    regions[idx] += 1
-                else:
-                    regions[idx] -= 1
+        cache = board.feature_cache
+        key = cache.get(self.color)
+        if key is not None:
+            return key
+        
+        features = cache.get(POSITION_FEATURES)
+        if features is None:
+            features = position_features(board)
+            cache[POSITION_FEATURES] = features
         
-        return regions
+        counts, quadrants, totals = features
+        own = quadrants.get(self.color, (0, 0, 0, 0))
+        regions = [2 * own[i] - totals[i] for i in range(4)]
+        
+        key = counts + tuple(regions)
+        cache[self.color] = key
+        return key
     
     def get_action_key(self, piece, destination):
         return (piece.row, piece.col, destination[0], destination[1])
@@ -64,33 +102,49 @@ class LearningAgent:
     def get_value(self, state, action):
         return self.value_table.get((state, action), 0.0)
     
-    def choose_move(self, board, rules):
+    def choose_move(self, board, rules, deadline=None):
+        if self.rng.random() < self.exploration_rate:
+            chosen = rules.random_move(self.color, self.rng)
+            if chosen is None:
+                return None
+        else:
+            chosen = self._choose_greedy(board, rules)
+            if chosen is None:
+                return None
+        
+        self.record_choice(board, chosen)
+        return chosen
+    
+    def record_choice(self, board, move):
+        self.last_state = self.get_state_key(board)
+        self.last_action = self.get_action_key(move[0], move[1])
+    
+    def _choose_greedy(self, board, rules):
         all_moves = rules.get_all_valid_moves(self.color)
         
         if not all_moves:
             return None
         
-        move_list = []
-        for piece, destinations in all_moves.items():
-            for dest, captured in destinations.items():
-                move_list.append((piece, dest, captured))
-        
-        if not move_list:
-            return None
-        
         state = self.get_state_key(board)
+        learned = True
+        if self.caches_best:
+            entry = self.best_actions.get(state)
+            if entry is None:
+                learned = False
+            elif entry[0] is not None:
+                cached = self._cached_best_move(board, entry, all_moves)
+                if cached is not None:
+                    return cached
         
-        if random.random() < self.exploration_rate:
-            chosen = random.choice(move_list)
-        else:
-            best_value = float('-inf')
-            best_moves = []
-            
-            for piece, dest, captured in move_list:
+        best_value = float('-inf')
+        best_moves = []
+        
+        for piece, destinations in all_moves.items():
+            for dest, captured in destinations.items():
                 action = self.get_action_key(piece, dest)
-                value = self.get_value(state, action)
+                value = self.get_value(state, action) if learned else 0.0
                 
-                immediate_reward = len(captured) * 3
+                immediate_reward = len(captured) * CAPTURE_BONUS
                 total_value = value + immediate_reward
                 
                 if total_value > best_value:
@@ -98,83 +152,249 @@ class LearningAgent:
                     best_moves = [(piece, dest, captured)]
                 elif total_value == best_value:
                     best_moves.append((piece, dest, captured))
-            
-            chosen = random.choice(best_moves)
         
-        self.last_state = state
-        self.last_action = self.get_action_key(chosen[0], chosen[1])
+        if not best_moves:
+            return None
         
-        return chosen
+        return self.rng.choice(best_moves)
+    
+    def _cached_best_move(self, board, entry, all_moves):
+        action, value, bound = entry
+        if value <= bound or value <= 0.0:
+            return None
+        
+        piece = board.piece_at(action[0], action[1])
+        captured = all_moves.get(piece, {}).get((action[2], action[3]))
+        if captured is None or captured:
+            return None
+        return piece, (action[2], action[3]), captured
+    
+    def _index_state(self, state, items):
+        best_action = None
+        best_value = bound = UNLEARNED
+        
+        for action, value in items:
+            if value > best_value:
+                bound = max(bound, best_value)
+                best_action, best_value = action, value
+            else:
+                bound = max(bound, value)
+        
+        entry = self.best_actions[state] = (best_action, best_value, bound)
+        return entry
+    
+    def _note_value(self, state, action, value):
+        entry = self.best_actions.get(state)
+        if entry is None:
+            self.best_actions[state] = (action, value, UNLEARNED)
+            return
+        
+        best_action, best_value, bound = entry
+        if action == best_action:
+            if value > bound:
+                self.best_actions[state] = (action, value, bound)
+            else:
+                self.best_actions[state] = (None, bound, bound)
+        elif value > best_value:
+            self.best_actions[state] = (action, value, max(bound, best_value))
+        else:
+            self.best_actions[state] = (best_action, best_value, max(bound, value))
+    
+    def _rebuild_best_actions(self):
+        self.best_actions = {}
+        if self.caches_best:
+            for (state, action), value in self.value_table.items():
+                self._note_value(state, action, value)
     
     def learn(self, board, reward):
         if self.last_state is None or self.last_action is None:
             return
         
         new_state = self.get_state_key(board)
+        self.update(self.last_state, self.last_action, reward, new_state)
+    
+    def update(self, state, action, reward, new_state):
+        max_future = self._max_future_value(new_state)
         
-        max_future = 0.0
-        for key, value in self.value_table.items():
-            if key[0] == new_state:
-                max_future = max(max_future, value)
-        
-        current = self.get_value(self.last_state, self.last_action)
+        current = self.get_value(state, action)
         
         new_value = current + self.learning_rate * (
             reward + self.discount_factor * max_future - current
         )
         
-        self.value_table[(self.last_state, self.last_action)] = new_value
+        self.set_value(state, action, new_value)
     
-    def calculate_reward(self, captured_pieces, became_king, game_over, won):
-        reward = 0
+    def set_value(self, state, action, value):
+        key = (state, action)
+        self.value_table[key] = value
+        if self.tracks_changes:
+            self.dirty_keys.add(key)
         
-        for piece in captured_pieces:
-            if piece.is_king:
-                reward += 5
-            else:
-                reward += 3
-        
-        if became_king:
-            reward += 5
-        
-        if game_over:
-            if won:
-                reward += 100
-            else:
-                reward -= 100
+        if self.caches_best:
+            self._note_value(state, action, value)
+    
+    def _max_future_value(self, state):
+        if not self.caches_best:
+            return max([0.0] + [value for _, value in self._state_items(state)])
         
-        return reward
+        entry = self.best_actions.get(state)
+        if entry is None:
+            return 0.0
+        if entry[0] is None:
+            entry = self._index_state(state, self._state_items(state))
+        return max(0.0, entry[1])
+    
+    def _state_items(self, state):
+        if self.indexed_table:
+            return self.value_table.state_items(state)
+        return [(key[1], value) for key, value in self.value_table.items() if key[0] == state]
+    
+    def calculate_reward(self, captured_pieces, became_king, game_over, won):
+        return shaped_reward(captured_pieces, became_king, game_over, won)
     
     def reset(self):
         self.last_state = None
         self.last_action = None
     
+    def has_unsaved_changes(self):
+        if not self.tracks_changes:
+            return True
+        return bool(self.dirty_keys)
+    
     def save(self, filepath):
+        if self.persistent_table:
+            self.value_table.flush()
+            return
+        
         save_dir = os.path.dirname(filepath)
         if save_dir and not os.path.exists(save_dir):
             os.makedirs(save_dir)
         
+        if (not self.tracks_changes or filepath != self._persist_path
+                or not os.path.exists(filepath)):
+            self.wait_for_compaction()
+            self._write_snapshot(filepath, self.value_table)
+            for suffix in (DELTA_SUFFIX, COMPACTING_SUFFIX):
+                if os.path.exists(filepath + suffix):
+                    os.remove(filepath + suffix)
+            self._persist_path = filepath
+            self._delta_entries = 0
+            self.dirty_keys = set()
+            return
+        
+        if not self.dirty_keys:
+            return
+        
+        lines = []
+        for key in self.dirty_keys:
+            state, action = key
+            lines.append(json.dumps([state, action, self.value_table[key]]))
+        
+        with open(filepath + DELTA_SUFFIX, "a") as f:
+            f.write("\n".join(lines) + "\n")
+        
+        self._delta_entries += len(lines)
+        self.dirty_keys = set()
+        
+        threshold = max(self.min_compaction_entries,
+                        len(self.value_table) * self.compaction_ratio)
+        if self._delta_entries >= threshold:
+            self.compact(filepath)
+    
+    def compact(self, filepath):
+        self.wait_for_compaction()
+        
+        delta_path = filepath + DELTA_SUFFIX
+        old_path = filepath + COMPACTING_SUFFIX
+        
+        if os.path.exists(delta_path):
+            if os.path.exists(old_path):
+                with open(delta_path, "r") as src, open(old_path, "a") as dst:
+                    dst.write(src.read())
+                os.remove(delta_path)
+            else:
+                os.replace(delta_path, old_path)
+        
+        snapshot = dict(self.value_table)
+        self._delta_entries = 0
+        
+        self._compactor = threading.Thread(
+            target=self._finish_compaction, args=(filepath, snapshot)
+        )
+        self._compactor.start()
+    
+    def _finish_compaction(self, filepath, snapshot):
+        self._write_snapshot(filepath, snapshot)
+        
+        old_path = filepath + COMPACTING_SUFFIX
+        if os.path.exists(old_path):
+            os.remove(old_path)
+    
+    def wait_for_compaction(self):
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+    
+    def _write_snapshot(self, filepath, table):
         serializable = {}
-        for key, value in self.value_table.items():
+        for key, value in table.items():
             state, action = key
             str_key = f"{state}|{action}"
             serializable[str_key] = value
         
-        with open(filepath, "w") as f:
+        tmp_path = filepath + ".tmp"
+        with open(tmp_path, "w") as f:
             json.dump(serializable, f)
+        os.replace(tmp_path, filepath)
     
     def load(self, filepath):
+        if self.persistent_table:
+            return len(self.value_table) > 0
+        
         if not os.path.exists(filepath):
             return False
         
+        self.wait_for_compaction()
+        
         with open(filepath, "r") as f:
             serializable = json.load(f)
         
-        self.value_table = {}
+        if self.tracks_changes:
+            self.value_table = {}
+        
         for str_key, value in serializable.items():
             parts = str_key.split("|")
             state = eval(parts[0])
             action = eval(parts[1])
             self.value_table[(state, action)] = value
         
+        self._delta_entries = 0
+        for suffix in (COMPACTING_SUFFIX, DELTA_SUFFIX):
+            self._delta_entries += self._replay_deltas(filepath + suffix)
+        
+        self._persist_path = filepath
+        self.dirty_keys = set()
+        self._rebuild_best_actions()
         return True
+    
+    def _replay_deltas(self, delta_path):
+        if not os.path.exists(delta_path):
+            return 0
+        
+        count = 0
+        line = b"\n"
+        with open(delta_path, "rb") as f:
+            for line in f:
+                try:
+                    state, action, value = json.loads(line)
+                except ValueError:
+                    continue
+                self.value_table[(tuple(state), tuple(action))] = value
+                count += 1
+        
+        # A crash mid-save can leave a torn last line; end it so later appends start clean
+        if not line.endswith(b"\n"):
+            with open(delta_path, "ab") as f:
+                f.write(b"\n")
+        
+        return count
@@ -0,0 +1,60 @@
+import threading
+
+from ai.agent import LearningAgent
+
+
+class AgentRegistry:
+    
+    def __init__(self, save_dir, colors):
+        self.save_dir = save_dir
+        self.colors = list(colors)
+        self.agents = {}
+        self._ready = {color: threading.Event() for color in self.colors}
+        self._locks = {color: threading.Lock() for color in self.colors}
+        self._loader = None
+    
+    def get_save_path(self, color):
+        return f"{self.save_dir}/agent_{color}.json"
+    
+    def preload(self):
+        if self._loader is not None:
+            return
+        
+        self._loader = threading.Thread(target=self._load_all, daemon=True)
+        self._loader.start()
+    
+    def _load_all(self):
+        for color in self.colors:
+            self._load(color)
+    
+    def _load(self, color):
+        with self._locks[color]:
+            if self._ready[color].is_set():
+                return
+            
+            agent = LearningAgent(color)
+            agent.load(self.get_save_path(color))
+            self.agents[color] = agent
+            self._ready[color].set()
+    
+    def get(self, color):
+        if not self._ready[color].is_set():
+            self._load(color)
+        
+        agent = self.agents[color]
+        agent.reset()
+        return agent
+    
+    def get_many(self, colors):
+        return {color: self.get(color) for color in colors}
+    
+    def loaded(self):
+        return {color: self.agents[color] for color in self.colors if self._ready[color].is_set()}
+    
+    def save_changed(self):
+        saved = []
+        for color, agent in self.loaded().items():
+            if agent.has_unsaved_changes():
+                agent.save(self.get_save_path(color))
+                saved.append(color)
+        return saved
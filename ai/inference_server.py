@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import queue
+import random
+import socket
+import threading
+
+from ai.agent import CAPTURE_BONUS, LearningAgent, shaped_reward
+
+
+COLORS = ["red", "black", "blue", "green", "yellow"]
+
+
+def best_action_indices(table, state, actions):
+    best_value = float('-inf')
+    best = []
+    for index, (r, c, r2, c2, captures) in enumerate(actions):
+        value = table.get((state, (r, c, r2, c2)), 0.0) + captures * CAPTURE_BONUS
+        if value > best_value:
+            best_value = value
+            best = [index]
+        elif value == best_value:
+            best.append(index)
+    return best
+
+
+class InferenceServer:
+    
+    def __init__(self, socket_path, save_dir="saved_models", max_batch=256, batch_window=0.0005):
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.tables = {}
+        
+        for color in COLORS:
+            agent = LearningAgent(color)
+            if agent.load(os.path.join(save_dir, f"agent_{color}.json")):
+                self.tables[color] = agent.value_table
+        
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(socket_path)
+        self.server.listen()
+        
+        self.requests = queue.Queue()
+        self.running = True
+        self.served = 0
+        self.batches = 0
+    
+    def serve_forever(self):
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        try:
+            while self.running:
+                conn, _ = self.server.accept()
+                threading.Thread(target=self._read_client, args=(conn,), daemon=True).start()
+        except OSError:
+            if self.running:
+                raise
+    
+    def _read_client(self, conn):
+        reader = conn.makefile("r")
+        writer = conn.makefile("w")
+        for line in reader:
+            self.requests.put((writer, line))
+        conn.close()
+    
+    def _batch_loop(self):
+        while self.running:
+            batch = [self.requests.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self.requests.get(timeout=self.batch_window))
+            except queue.Empty:
+                pass
+            
+            replies = {}
+            for writer, line in batch:
+                replies.setdefault(writer, []).append(json.dumps(self._respond(line)))
+            
+            for writer, lines in replies.items():
+                try:
+                    writer.write("\n".join(lines) + "\n")
+                    writer.flush()
+                except OSError:
+                    pass
+            
+            self.served += len(batch)
+            self.batches += 1
+    
+    def _respond(self, line):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            return {"id": request_id, "best": self.best_actions(request)}
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            return {"id": request_id, "error": f"{type(error).__name__}: {error}"}
+    
+    def best_actions(self, request):
+        table = self.tables.get(request["color"], {})
+        return best_action_indices(table, tuple(request["state"]), request["actions"])
+    
+    def close(self):
+        self.running = False
+        self.server.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class RemoteAgent:
+    
+    def __init__(self, color, socket_path, exploration_rate=0.0):
+        self.color = color
+        self.socket_path = socket_path
+        self.exploration_rate = exploration_rate
+        self.rng = random
+        self.local = LearningAgent(color, exploration_rate=exploration_rate)
+        self.sock = None
+        self.next_id = 0
+        self.lock = threading.Lock()
+    
+    def _connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+        self.reader = self.sock.makefile("r")
+        self.writer = self.sock.makefile("w")
+    
+    def request(self, state, actions):
+        with self.lock:
+            if self.sock is None:
+                self._connect()
+            
+            self.next_id += 1
+            message = {"id": self.next_id, "color": self.color, "state": state,
+                       "actions": actions}
+            self.writer.write(json.dumps(message) + "\n")
+            self.writer.flush()
+            reply = json.loads(self.reader.readline())
+        
+        if "error" in reply:
+            return best_action_indices(self.local.value_table, state, actions)
+        return reply["best"]
+    
+    def choose_move(self, board, rules, deadline=None):
+        if self.rng.random() < self.exploration_rate:
+            chosen = rules.random_move(self.color, self.rng)
+        else:
+            moves = [
+                (piece, dest, captured)
+                for piece, destinations in rules.get_all_valid_moves(self.color).items()
+                for dest, captured in destinations.items()
+            ]
+            if not moves:
+                return None
+            
+            actions = [
+                [piece.row, piece.col, dest[0], dest[1], len(captured)]
+                for piece, dest, captured in moves
+            ]
+            best = self.request(self.local.get_state_key(board), actions)
+            chosen = moves[self.rng.choice(best)]
+        
+        if chosen is not None:
+            self.record_choice(board, chosen)
+        return chosen
+    
+    def record_choice(self, board, move):
+        self.local.record_choice(board, move)
+    
+    def learn(self, board, reward):
+        pass
+    
+    def calculate_reward(self, captured_pieces, became_king, game_over, won):
+        return shaped_reward(captured_pieces, became_king, game_over, won)
+    
+    def reset(self):
+        self.local.reset()
+    
+    def close(self):
+        with self.lock:
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve agent moves over a Unix socket")
+    parser.add_argument("save_dir", nargs="?", default="saved_models")
+    parser.add_argument("--socket", default="/tmp/checkers_inference.sock")
+    parser.add_argument("--max-batch", type=int, default=256)
+    args = parser.parse_args()
+    
+    server = InferenceServer(args.socket, args.save_dir, args.max_batch)
+    sizes = ", ".join(f"{color}: {len(table)}" for color, table in server.tables.items())
+    print(f"Serving {sizes or 'no tables'} on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        print(f"Served {server.served} requests in {server.batches} batches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import math
+
+
+COUNT_BITS = {2: 7, 4: 6}
+REGION_BITS = 6
+REGION_OFFSET = 1 << (REGION_BITS - 1)
+SQUARE_BITS = 7
+ACTION_BITS = 2 * SQUARE_BITS
+NUM_REGIONS = 4
+
+
+def num_colors_for_size(board_size):
+    return 2 if board_size == 8 else 4
+
+
+def pack_state(state):
+    num_colors = (len(state) - NUM_REGIONS) // 2
+    count_bits = COUNT_BITS[num_colors]
+    packed = 0
+    
+    for i in range(num_colors):
+        count = state[2 * i]
+        kings = state[2 * i + 1]
+        code = count * (count + 1) // 2 + kings
+        if code >> count_bits:
+            raise ValueError(f"Piece count {count} does not fit in {count_bits} bits")
+        packed = (packed << count_bits) | code
+    
+    for region in state[2 * num_colors:]:
+        if not -REGION_OFFSET <= region < REGION_OFFSET:
+            raise ValueError(f"Region value {region} does not fit in {REGION_BITS} bits")
+        packed = (packed << REGION_BITS) | (region + REGION_OFFSET)
+    
+    return packed
+
+
+def unpack_state(packed, num_colors):
+    count_bits = COUNT_BITS[num_colors]
+    regions = []
+    for _ in range(NUM_REGIONS):
+        regions.append((packed & ((1 << REGION_BITS) - 1)) - REGION_OFFSET)
+        packed >>= REGION_BITS
+    regions.reverse()
+    
+    counts = []
+    for _ in range(num_colors):
+        code = packed & ((1 << count_bits) - 1)
+        packed >>= count_bits
+        count = (math.isqrt(8 * code + 1) - 1) // 2
+        counts.append((count, code - count * (count + 1) // 2))
+    counts.reverse()
+    
+    state = []
+    for count, kings in counts:
+        state.append(count)
+        state.append(kings)
+    state.extend(regions)
+    return tuple(state)
+
+
+def pack_action(action, board_size):
+    from_row, from_col, to_row, to_col = action
+    source = (from_row * board_size + from_col) // 2
+    target = (to_row * board_size + to_col) // 2
+    return (source << SQUARE_BITS) | target
+
+
+def unpack_action(packed, board_size):
+    source = packed >> SQUARE_BITS
+    target = packed & ((1 << SQUARE_BITS) - 1)
+    return _dark_square(source, board_size) + _dark_square(target, board_size)
+
+
+def _dark_square(index, board_size):
+    half = board_size // 2
+    row = index // half
+    col = (index % half) * 2 + (1 - row % 2)
+    return (row, col)
+
+
+def pack_key(state, action, board_size):
+    return (pack_state(state) << ACTION_BITS) | pack_action(action, board_size)
+
+
+def unpack_key(packed, board_size):
+    state = unpack_state(packed >> ACTION_BITS, num_colors_for_size(board_size))
+    action = unpack_action(packed & ((1 << ACTION_BITS) - 1), board_size)
+    return state, action
+
+
+def state_of_key(packed):
+    return packed >> ACTION_BITS
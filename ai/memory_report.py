@@ -0,0 +1,174 @@
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from itertools import islice
+
+
+def deep_sizeof(obj, seen=None):
+    if seen is None:
+        seen = set()
+    
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif hasattr(current, "__dict__"):
+            stack.append(current.__dict__)
+    
+    return total
+
+
+def sample_keys(table, sample_size, seed=0):
+    indices = sorted(random.Random(seed).sample(range(len(table)), sample_size))
+    keys = iter(table)
+    sample = []
+    position = 0
+    for index in indices:
+        sample.append(next(islice(keys, index - position, None)))
+        position = index + 1
+    return sample
+
+
+def table_memory(table, sample_size=2000):
+    if hasattr(table, "nbytes"):
+        return table.nbytes()
+    
+    if not isinstance(table, dict):
+        return None
+    
+    entries = len(table)
+    if entries == 0:
+        return sys.getsizeof(table)
+    
+    if entries > sample_size:
+        keys = sample_keys(table, sample_size)
+    else:
+        keys = list(table)
+    
+    seen = set()
+    sample_bytes = 0
+    for key in keys:
+        sample_bytes += deep_sizeof(key, seen) + deep_sizeof(table[key], seen)
+    
+    return sys.getsizeof(table) + int(sample_bytes / len(keys) * entries)
+
+
+def agent_report(agent):
+    table = agent.value_table
+    entries = len(table)
+    approx_bytes = table_memory(table)
+    cache = getattr(agent, "best_actions", None)
+    
+    report = {
+        "color": agent.color,
+        "backend": type(table).__name__,
+        "entries": entries,
+        "approx_bytes": approx_bytes,
+        "bytes_per_entry": round(approx_bytes / entries, 1) if approx_bytes and entries else None,
+        "states": None,
+        "keys_per_state": None,
+        "cache_entries": len(cache) if cache is not None else None,
+        "cache_bytes": table_memory(cache) if cache is not None else None,
+    }
+    
+    # Dict agents keep one best-action cache entry per learned state
+    if isinstance(table, dict) and entries and cache:
+        report["states"] = len(cache)
+        report["keys_per_state"] = round(entries / len(cache), 2)
+    
+    return report
+
+
+def process_rss_bytes():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return None
+
+
+def object_counts(top=10):
+    counts = {}
+    for obj in gc.get_objects():
+        name = type(obj).__name__
+        counts[name] = counts.get(name, 0) + 1
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return dict(ranked[:top])
+
+
+def top_allocations(top=10):
+    if not tracemalloc.is_tracing():
+        return []
+    
+    snapshot = tracemalloc.take_snapshot()
+    allocations = []
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        allocations.append({
+            "location": f"{frame.filename}:{frame.lineno}",
+            "bytes": stat.size,
+            "blocks": stat.count,
+        })
+    return allocations
+
+
+def memory_report(agents, boards=None, top=10, census=False):
+    report = {
+        "timestamp": time.time(),
+        "rss_bytes": process_rss_bytes(),
+        "agents": [agent_report(agent) for agent in agents],
+        "object_counts": object_counts(top) if census else {},
+        "top_allocations": top_allocations(top),
+    }
+    
+    if boards:
+        report["board_bytes"] = [deep_sizeof(board) for board in boards]
+    
+    return report
+
+
+def append_report(filepath, report):
+    save_dir = os.path.dirname(filepath)
+    if save_dir and not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+    
+    with open(filepath, "a") as f:
+        f.write(json.dumps(report) + "\n")
+    
+    return filepath
+
+
+def format_report(report):
+    lines = [f"RSS: {(report['rss_bytes'] or 0) / 1e6:.1f} MB"]
+    for agent in report["agents"]:
+        size = agent["approx_bytes"]
+        size_text = f"{size / 1e6:.1f} MB" if size is not None else "n/a"
+        cache = agent.get("cache_bytes")
+        cache_text = f", cache {cache / 1e6:.1f} MB" if cache is not None else ""
+        lines.append(
+            f"  {agent['color']}: {agent['entries']} entries, {size_text}{cache_text}, "
+            f"{agent['keys_per_state']} keys/state"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,66 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def format_metrics(snapshot, prefix="checkers"):
+    lines = []
+    for name, (kind, help_text, samples) in sorted(snapshot.items()):
+        metric = f"{prefix}_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        
+        if isinstance(samples, dict):
+            label, values = samples["label"], samples["values"]
+            for key, value in sorted(values.items()):
+                lines.append(f'{metric}{{{label}="{key}"}} {float(value)}')
+        else:
+            lines.append(f"{metric} {float(samples)}")
+    
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    
+    def __init__(self, port=9100, host="127.0.0.1"):
+        self.snapshot = {}
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    
+    def _make_handler(self):
+        metrics_server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                
+                body = format_metrics(metrics_server.snapshot).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+    
+    def start(self):
+        self.thread.start()
+        return self
+    
+    def publish(self, snapshot):
+        self.snapshot = snapshot
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
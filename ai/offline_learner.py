@@ -0,0 +1,176 @@
+import multiprocessing
+import os
+import sys
+import time
+
+from game.board import Board
+from game.rules import Rules
+from game.record import read_records, board_size_for_mode
+from ai.agent import LearningAgent, shaped_reward
+
+
+LOSS_PENALTY = -50
+_DONE = None
+
+
+def replay_record(record, reward_fn=shaped_reward, loss_penalty=LOSS_PENALTY):
+    board = Board(board_size_for_mode(record.game_mode), record.game_mode)
+    rules = Rules(board)
+    extractors = {color: LearningAgent(color) for color in record.players}
+    last = {}
+    
+    final_index = len(record.moves) - 1
+    ended = record.reason == 'game_over'
+    decided = ended or record.reason == 'adjudicated'
+    
+    for i, (source, destination, _) in enumerate(record.moves):
+        piece = board.get_piece(*source)
+        if piece is None:
+            raise ValueError(f"Record move {i} starts from an empty square {source}")
+        
+        moves = rules.get_valid_moves(piece)
+        if destination not in moves:
+            raise ValueError(f"Record move {i} {source}->{destination} is not legal")
+        
+        color = piece.color
+        extractor = extractors[color]
+        state = extractor.get_state_key(board)
+        action = extractor.get_action_key(piece, destination)
+        captured = moves[destination]
+        was_king = piece.is_king
+        
+        rules.execute_move(piece, destination, captured)
+        
+        became_king = not was_king and piece.is_king
+        game_over = ended and i == final_index
+        won = game_over and record.winner == color
+        
+        reward = reward_fn(captured, became_king, game_over, won)
+        yield color, state, action, reward, extractor.get_state_key(board)
+        last[color] = (state, action)
+    
+    if decided:
+        for color, (state, action) in last.items():
+            if color != record.winner:
+                yield color, state, action, loss_penalty, extractors[color].get_state_key(board)
+
+
+def iter_transitions(filepath, reward_fn=shaped_reward, loss_penalty=LOSS_PENALTY):
+    for record in read_records(filepath):
+        yield from replay_record(record, reward_fn, loss_penalty)
+
+
+def iter_batches(transitions, batch_size):
+    batch = []
+    for transition in transitions:
+        batch.append(transition)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+_worker_queue = None
+
+
+def _init_worker(queue):
+    global _worker_queue
+    _worker_queue = queue
+
+
+def _replay_file(filepath, reward_fn, loss_penalty, batch_size):
+    count = 0
+    try:
+        transitions = iter_transitions(filepath, reward_fn, loss_penalty)
+        for batch in iter_batches(transitions, batch_size):
+            _worker_queue.put(batch)
+            count += len(batch)
+    finally:
+        _worker_queue.put(_DONE)
+    return count
+
+
+class OfflineLearner:
+    
+    def __init__(self, agents, reward_fn=shaped_reward, loss_penalty=LOSS_PENALTY,
+                 batch_size=4096, num_workers=None):
+        self.agents = agents
+        self.reward_fn = reward_fn
+        self.loss_penalty = loss_penalty
+        self.batch_size = batch_size
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.transitions_applied = 0
+    
+    def apply_batch(self, batch):
+        for color, state, action, reward, new_state in batch:
+            agent = self.agents.get(color)
+            if agent is not None:
+                agent.update(state, action, reward, new_state)
+        self.transitions_applied += len(batch)
+    
+    def learn_from_files(self, filepaths, epochs=1):
+        for _ in range(epochs):
+            if self.num_workers <= 1 or len(filepaths) <= 1:
+                for filepath in filepaths:
+                    transitions = iter_transitions(filepath, self.reward_fn, self.loss_penalty)
+                    for batch in iter_batches(transitions, self.batch_size):
+                        self.apply_batch(batch)
+            else:
+                self._learn_parallel(filepaths)
+        
+        return self.transitions_applied
+    
+    def _learn_parallel(self, filepaths):
+        workers = min(self.num_workers, len(filepaths))
+        queue = multiprocessing.Queue(maxsize=4 * workers)
+        
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(queue,)) as pool:
+            result = pool.starmap_async(_replay_file, [
+                (filepath, self.reward_fn, self.loss_penalty, self.batch_size)
+                for filepath in filepaths
+            ])
+            
+            remaining = len(filepaths)
+            while remaining:
+                batch = queue.get()
+                if batch is _DONE:
+                    remaining -= 1
+                else:
+                    self.apply_batch(batch)
+            
+            result.get()
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python -m ai.offline_learner <save_dir> <record files...>")
+        return
+    
+    save_dir = sys.argv[1]
+    filepaths = sys.argv[2:]
+    
+    first = next(read_records(filepaths[0]), None)
+    if first is None:
+        print("No games found")
+        return
+    
+    agents = {}
+    for color in first.players:
+        agent = LearningAgent(color, learning_rate=0.1, discount_factor=0.95)
+        agent.load(os.path.join(save_dir, f"agent_{color}.json"))
+        agents[color] = agent
+    
+    learner = OfflineLearner(agents)
+    start = time.perf_counter()
+    applied = learner.learn_from_files(filepaths)
+    elapsed = time.perf_counter() - start
+    
+    for color, agent in agents.items():
+        agent.save(os.path.join(save_dir, f"agent_{color}.json"))
+    
+    print(f"Applied {applied} transitions from {len(filepaths)} files in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
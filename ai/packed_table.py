@@ -0,0 +1,139 @@
+import struct
+from array import array
+
+from ai.keys import pack_key, pack_state, state_of_key, unpack_key
+from ai.shared_table import HASH_MASK, HASH_MULTIPLIER
+
+
+FIXED_SCALE = 100
+INT16_MIN = -(1 << 15)
+INT16_MAX = (1 << 15) - 1
+HALF_MAX = 65504.0
+MAX_LOAD = 0.7
+VALUE_FORMATS = ("fixed", "half")
+
+_HALF = struct.Struct("<e")
+_BITS = struct.Struct("<H")
+
+
+class PackedValueTable:
+    
+    def __init__(self, board_size, capacity=1 << 16, value_format="fixed", scale=FIXED_SCALE):
+        if value_format not in VALUE_FORMATS:
+            raise ValueError(f"Unknown value format: {value_format}")
+        
+        self.board_size = board_size
+        self.value_format = value_format
+        self.scale = scale
+        self.count = 0
+        self._allocate(max(8, 1 << (capacity - 1).bit_length()))
+    
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.keys = array("Q", bytes(8 * capacity))
+        self.values = array("h" if self.value_format == "fixed" else "H", bytes(2 * capacity))
+    
+    def encode(self, value):
+        if self.value_format == "fixed":
+            return max(INT16_MIN, min(INT16_MAX, round(value * self.scale)))
+        value = max(-HALF_MAX, min(HALF_MAX, value))
+        return _BITS.unpack(_HALF.pack(value))[0]
+    
+    def decode(self, code):
+        if self.value_format == "fixed":
+            return code / self.scale
+        return _HALF.unpack(_BITS.pack(code))[0]
+    
+    def _home(self, packed_state):
+        return (((packed_state * HASH_MULTIPLIER) & HASH_MASK) >> 32) & self.mask
+    
+    def _find(self, packed):
+        keys = self.keys
+        mask = self.mask
+        stored = packed + 1
+        slot = self._home(state_of_key(packed))
+        
+        while True:
+            current = keys[slot]
+            if current == stored or current == 0:
+                return slot, current == stored
+            slot = (slot + 1) & mask
+    
+    def _pack(self, key):
+        return pack_key(key[0], key[1], self.board_size)
+    
+    def get(self, key, default=None):
+        slot, found = self._find(self._pack(key))
+        if found:
+            return self.decode(self.values[slot])
+        return default
+    
+    def __getitem__(self, key):
+        slot, found = self._find(self._pack(key))
+        if not found:
+            raise KeyError(key)
+        return self.decode(self.values[slot])
+    
+    def __contains__(self, key):
+        return self._find(self._pack(key))[1]
+    
+    def __setitem__(self, key, value):
+        packed = self._pack(key)
+        slot, found = self._find(packed)
+        
+        if not found:
+            if self.count + 1 > self.capacity * MAX_LOAD:
+                self._grow()
+                slot, found = self._find(packed)
+            self.keys[slot] = packed + 1
+            self.count += 1
+        
+        self.values[slot] = self.encode(value)
+    
+    def _grow(self):
+        old_keys, old_values = self.keys, self.values
+        self._allocate(self.capacity * 2)
+        
+        for stored, code in zip(old_keys, old_values):
+            if stored != 0:
+                slot, _ = self._find(stored - 1)
+                self.keys[slot] = stored
+                self.values[slot] = code
+    
+    def state_items(self, state):
+        packed_state = pack_state(state)
+        keys = self.keys
+        slot = self._home(packed_state)
+        
+        items = []
+        while True:
+            stored = keys[slot]
+            if stored == 0:
+                break
+            if state_of_key(stored - 1) == packed_state:
+                action = unpack_key(stored - 1, self.board_size)[1]
+                items.append((action, self.decode(self.values[slot])))
+            slot = (slot + 1) & self.mask
+        
+        return items
+    
+    def __len__(self):
+        return self.count
+    
+    def copy(self):
+        table = PackedValueTable(self.board_size, 8, self.value_format, self.scale)
+        table.count = self.count
+        table.capacity = self.capacity
+        table.mask = self.mask
+        table.keys = array("Q", self.keys)
+        table.values = array(self.values.typecode, self.values)
+        return table
+    
+    def items(self):
+        for stored, code in zip(self.keys, self.values):
+            if stored != 0:
+                yield unpack_key(stored - 1, self.board_size), self.decode(code)
+    
+    def nbytes(self):
+        return self.keys.itemsize * len(self.keys) + self.values.itemsize * len(self.values)
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from game.rules import Rules
+from ai.search_agent import play_on_copy
+
+
+class Ponderer:
+    
+    def __init__(self, players, human_color, ai_players):
+        self.players = list(players)
+        self.human_color = human_color
+        self.ai_players = ai_players
+        self.cache = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.hits = 0
+        self.misses = 0
+    
+    def start(self, board, budget):
+        self.stop()
+        self.cache = {}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(
+            target=self._ponder, args=(board.copy(), budget, self.stop_event), daemon=True
+        )
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+    
+    def lookup(self, board, color):
+        entry = self.cache.get((board.get_state_key(), color))
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        source, destination = entry
+        piece = board.get_piece(*source)
+        if piece is None or piece.color != color:
+            self.misses += 1
+            return None
+        
+        moves = Rules(board).get_valid_moves(piece)
+        if destination not in moves:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return piece, destination, moves[destination]
+    
+    def _likely_moves(self, board, rules):
+        next_color = self.players[(self.players.index(self.human_color) + 1) % len(self.players)]
+        scored = []
+        for move in rules.iter_moves(self.human_color):
+            child_board, child_rules = play_on_copy(board, move)
+            safe = not child_rules.has_captures(next_color)
+            scored.append((len(move[2]), safe, move))
+        
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [move for _, _, move in scored]
+    
+    def _ponder(self, board, budget, stop_event):
+        rules = Rules(board)
+        human_index = self.players.index(self.human_color)
+        
+        for move in self._likely_moves(board, rules):
+            if stop_event.is_set():
+                return
+            
+            child_board, child_rules = play_on_copy(board, move)
+            index = (human_index + 1) % len(self.players)
+            
+            while self.players[index] in self.ai_players:
+                color = self.players[index]
+                game_over, _ = child_rules.is_game_over(self.players)
+                if game_over:
+                    break
+                
+                reply = self.ai_players[color].choose_move(
+                    child_board, child_rules, time.perf_counter() + budget
+                )
+                if stop_event.is_set():
+                    return
+                if reply is None:
+                    index = (index + 1) % len(self.players)
+                    continue
+                
+                piece, destination, _ = reply
+                key = (child_board.get_state_key(), color)
+                self.cache[key] = ((piece.row, piece.col), destination)
+                
+                child_board, child_rules = play_on_copy(child_board, reply)
+                index = (index + 1) % len(self.players)
@@ -0,0 +1,162 @@
+import cProfile
+import io
+import os
+import pstats
+import signal
+import time
+
+
+class StackSampler:
+    
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self.available = hasattr(signal, "setitimer")
+        self._previous_handler = None
+    
+    def start(self):
+        if not self.available:
+            return
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+    
+    def stop(self):
+        if not self.available:
+            return
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+    
+    def mute(self):
+        if self.available:
+            signal.signal(signal.SIGPROF, signal.SIG_IGN)
+    
+    def unmute(self):
+        if self.available:
+            signal.signal(signal.SIGPROF, self._sample)
+    
+    def _sample(self, signum, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        
+        stack = ";".join(reversed(names))
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.samples += 1
+    
+    def write_collapsed(self, filepath):
+        with open(filepath, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class TrainingProfiler:
+    
+    def __init__(self, skip_games=100, num_games=200, output_prefix="training_logs/profile",
+                 sample_interval=0.005, top=30):
+        self.skip_games = skip_games
+        self.num_games = num_games
+        self.output_prefix = output_prefix
+        self.top = top
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(sample_interval)
+        self.active = False
+        self.paused = False
+        self.finished = False
+        self.tracing = False
+        self.games = 0
+        self.plies = 0
+        self.elapsed = 0.0
+        self._started_at = None
+        self._start_plies = 0
+    
+    def before_game(self, game_num, total_plies):
+        if self.finished or game_num <= self.skip_games:
+            return
+        
+        if not self.active:
+            self.active = True
+            self._start_plies = total_plies
+            self.sampler.start()
+            self._started_at = time.perf_counter()
+        
+        # Games alternate between cProfile and the sampler so neither records the other
+        self.tracing = self.games % 2 == 0 or not self.sampler.available
+        if self.tracing:
+            self.sampler.mute()
+            self.profile.enable()
+        else:
+            self.sampler.unmute()
+    
+    def after_game(self, game_num, total_plies):
+        if not self.active:
+            return False
+        
+        if self.tracing:
+            self.profile.disable()
+        self.sampler.mute()
+        self.games += 1
+        if self.games >= self.num_games:
+            self.finish(total_plies)
+            return True
+        return False
+    
+    def pause(self):
+        if not self.active or self.paused:
+            return
+        
+        self.elapsed += time.perf_counter() - self._started_at
+        self.paused = True
+    
+    def resume(self):
+        if not self.paused:
+            return
+        
+        self.paused = False
+        self._started_at = time.perf_counter()
+    
+    def finish(self, total_plies):
+        if not self.active:
+            return
+        
+        self.pause()
+        self.sampler.stop()
+        self.plies = total_plies - self._start_plies
+        self.active = False
+        self.paused = False
+        self.finished = True
+        self.write()
+    
+    def games_per_sec(self):
+        return self.games / self.elapsed if self.elapsed else 0.0
+    
+    def plies_per_sec(self):
+        return self.plies / self.elapsed if self.elapsed else 0.0
+    
+    def summary(self):
+        return (
+            f"Profiled games {self.skip_games + 1}-{self.skip_games + self.games}: "
+            f"{self.elapsed:.2f}s, {self.games_per_sec():.1f} games/sec, "
+            f"{self.plies_per_sec():.0f} plies/sec"
+        )
+    
+    def write(self):
+        save_dir = os.path.dirname(self.output_prefix)
+        if save_dir and not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+        
+        self.profile.dump_stats(self.output_prefix + ".prof")
+        
+        if self.sampler.available:
+            self.sampler.write_collapsed(self.output_prefix + ".folded")
+        
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        
+        with open(self.output_prefix + ".txt", "w") as f:
+            f.write(self.summary() + "\n")
+            f.write(f"Stack samples: {self.sampler.samples}\n\n")
+            f.write(stream.getvalue())
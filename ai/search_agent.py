@@ -0,0 +1,163 @@
+import time
+
+from game.rules import Rules
+
+
+WIN_SCORE = 10000
+INFINITY = float('inf')
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def play_on_copy(board, move):
+    piece, destination, captured = move
+    child_board = board.copy()
+    child_piece = child_board.get_piece(piece.row, piece.col)
+    child_captured = [child_board.get_piece(c.row, c.col) for c in captured]
+    
+    child_rules = Rules(child_board)
+    child_rules.execute_move(child_piece, destination, child_captured)
+    return child_board, child_rules
+
+
+class SearchAgent:
+    
+    def __init__(self, agent, players, max_depth=12, default_depth=3):
+        self.agent = agent
+        self.color = agent.color
+        self.players = list(players)
+        self.max_depth = max_depth
+        self.default_depth = default_depth
+        self.deadline = None
+        self.stop_event = None
+        self.nodes = 0
+        self.completed_depth = 0
+    
+    def choose_move(self, board, rules, deadline=None):
+        move = self.search(board, rules, deadline)
+        if move is not None:
+            self.agent.record_choice(board, move)
+        return move
+    
+    def record_choice(self, board, move):
+        self.agent.record_choice(board, move)
+    
+    def learn(self, board, reward):
+        self.agent.learn(board, reward)
+    
+    def calculate_reward(self, captured_pieces, became_king, game_over, won):
+        return self.agent.calculate_reward(captured_pieces, became_king, game_over, won)
+    
+    def reset(self):
+        self.agent.reset()
+    
+    def search(self, board, rules, deadline=None, stop_event=None):
+        root_moves = self._ordered_moves(rules, self.color)
+        if not root_moves:
+            return None
+        
+        self.deadline = deadline
+        self.stop_event = stop_event
+        self.nodes = 0
+        self.completed_depth = 0
+        max_depth = self.max_depth if deadline is not None else self.default_depth
+        
+        best = root_moves[0]
+        for depth in range(1, max_depth + 1):
+            try:
+                best, complete = self._search_root(board, root_moves, best, depth)
+            except SearchTimeout:
+                break
+            if not complete:
+                break
+            self.completed_depth = depth
+        
+        return best
+    
+    def _search_root(self, board, root_moves, previous_best, depth):
+        ordered = [previous_best] + [m for m in root_moves if m is not previous_best]
+        next_idx = self._next_index(self.players.index(self.color))
+        
+        best_move = None
+        best_score = -INFINITY
+        
+        for move in ordered:
+            try:
+                child_board, child_rules = play_on_copy(board, move)
+                score = self._alphabeta(child_board, child_rules, next_idx, depth - 1,
+                                        best_score, INFINITY)
+            except SearchTimeout:
+                if best_move is None:
+                    raise
+                return best_move, False
+            
+            if score > best_score:
+                best_score = score
+                best_move = move
+        
+        return best_move, True
+    
+    def _alphabeta(self, board, rules, player_idx, depth, alpha, beta):
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeout()
+        
+        game_over, winner = rules.is_game_over(self.players)
+        if game_over:
+            if winner == self.color:
+                return WIN_SCORE + depth
+            if winner is None:
+                return 0
+            return -WIN_SCORE - depth
+        
+        if depth <= 0:
+            return self._evaluate(board)
+        
+        color = self.players[player_idx]
+        moves = self._ordered_moves(rules, color)
+        next_idx = self._next_index(player_idx)
+        
+        if not moves:
+            return self._alphabeta(board, rules, next_idx, depth, alpha, beta)
+        
+        if color == self.color:
+            value = -INFINITY
+            for move in moves:
+                child_board, child_rules = play_on_copy(board, move)
+                value = max(value, self._alphabeta(child_board, child_rules, next_idx,
+                                                   depth - 1, alpha, beta))
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+        else:
+            value = INFINITY
+            for move in moves:
+                child_board, child_rules = play_on_copy(board, move)
+                value = min(value, self._alphabeta(child_board, child_rules, next_idx,
+                                                   depth - 1, alpha, beta))
+                beta = min(beta, value)
+                if alpha >= beta:
+                    break
+        
+        return value
+    
+    def _next_index(self, player_idx):
+        return (player_idx + 1) % len(self.players)
+    
+    def _ordered_moves(self, rules, color):
+        moves = list(rules.iter_moves(color))
+        moves.sort(key=lambda move: len(move[2]), reverse=True)
+        return moves
+    
+    def _evaluate(self, board):
+        material = {}
+        for color in self.players:
+            pieces = board.get_all_pieces(color)
+            material[color] = sum(3 if p.is_king else 2 for p in pieces)
+        
+        others = [material[c] for c in self.players if c != self.color]
+        return material[self.color] - sum(others) / len(others)
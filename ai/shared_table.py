@@ -0,0 +1,215 @@
+import multiprocessing
+import sys
+import time
+from multiprocessing import shared_memory
+
+from ai.keys import pack_key, pack_state, unpack_key, state_of_key
+
+
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+HASH_MASK = (1 << 64) - 1
+MAX_LOAD = 0.9
+
+
+class SharedValueTable:
+    
+    def __init__(self, board_size, capacity=1 << 20, num_stripes=64, name=None, locks=None):
+        self.board_size = board_size
+        self.num_stripes = num_stripes
+        self.segment_size = max(1, capacity // num_stripes)
+        self.capacity = self.segment_size * num_stripes
+        self.owner = name is None
+        
+        total_bytes = self.capacity * 12 + num_stripes * 8
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=total_bytes)
+            self.shm.buf[:total_bytes] = bytes(total_bytes)
+            self.locks = [multiprocessing.Lock() for _ in range(num_stripes)]
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.locks = locks
+        
+        self.name = self.shm.name
+        self._attach()
+    
+    def _attach(self):
+        keys_end = self.capacity * 8
+        values_end = keys_end + self.capacity * 4
+        counts_end = values_end + self.num_stripes * 8
+        
+        self.keys = self.shm.buf[:keys_end].cast("Q")
+        self.values = self.shm.buf[keys_end:values_end].cast("f")
+        self.counts = self.shm.buf[values_end:counts_end].cast("Q")
+    
+    def __getstate__(self):
+        return {
+            "board_size": self.board_size,
+            "capacity": self.capacity,
+            "num_stripes": self.num_stripes,
+            "name": self.name,
+            "locks": self.locks,
+        }
+    
+    def __setstate__(self, state):
+        self.__init__(
+            state["board_size"],
+            capacity=state["capacity"],
+            num_stripes=state["num_stripes"],
+            name=state["name"],
+            locks=state["locks"],
+        )
+    
+    def _home(self, packed_state):
+        h = (packed_state * HASH_MULTIPLIER) & HASH_MASK
+        stripe = (h >> 32) % self.num_stripes
+        offset = (h & 0xFFFFFFFF) % self.segment_size
+        return stripe, offset
+    
+    def _find(self, key):
+        packed = pack_key(key[0], key[1], self.board_size)
+        stripe, offset = self._home(state_of_key(packed))
+        base = stripe * self.segment_size
+        stored = packed + 1
+        
+        for _ in range(self.segment_size):
+            slot = base + offset
+            current = self.keys[slot]
+            if current == stored or current == 0:
+                return stripe, slot, stored, current == stored
+            offset += 1
+            if offset == self.segment_size:
+                offset = 0
+        
+        return stripe, None, stored, False
+    
+    def get(self, key, default=None):
+        stripe, slot, stored, found = self._find(key)
+        if found:
+            return self.values[slot]
+        return default
+    
+    def __getitem__(self, key):
+        stripe, slot, stored, found = self._find(key)
+        if not found:
+            raise KeyError(key)
+        return self.values[slot]
+    
+    def __contains__(self, key):
+        return self._find(key)[3]
+    
+    def _write(self, key, value, add):
+        stripe, slot, stored, found = self._find(key)
+        
+        with self.locks[stripe]:
+            if not found:
+                stripe, slot, stored, found = self._find(key)
+            
+            if found:
+                if add:
+                    value += self.values[slot]
+                self.values[slot] = value
+                return value
+            
+            if slot is None or self.counts[stripe] >= self.segment_size * MAX_LOAD:
+                raise MemoryError(f"SharedValueTable stripe {stripe} is full")
+            
+            self.values[slot] = value
+            self.keys[slot] = stored
+            self.counts[stripe] += 1
+            return value
+    
+    def __setitem__(self, key, value):
+        self._write(key, value, False)
+    
+    def add(self, key, delta):
+        return self._write(key, delta, True)
+    
+    def state_items(self, state):
+        packed_state = pack_state(state)
+        stripe, offset = self._home(packed_state)
+        base = stripe * self.segment_size
+        
+        items = []
+        for _ in range(self.segment_size):
+            stored = self.keys[base + offset]
+            if stored == 0:
+                break
+            if state_of_key(stored - 1) == packed_state:
+                items.append((unpack_key(stored - 1, self.board_size)[1], self.values[base + offset]))
+            offset += 1
+            if offset == self.segment_size:
+                offset = 0
+        
+        return items
+    
+    def __len__(self):
+        return sum(self.counts)
+    
+    def items(self):
+        for slot in range(self.capacity):
+            stored = self.keys[slot]
+            if stored != 0:
+                yield unpack_key(stored - 1, self.board_size), self.values[slot]
+    
+    def nbytes(self):
+        return self.shm.size
+    
+    def close(self):
+        self.keys.release()
+        self.values.release()
+        self.counts.release()
+        self.shm.close()
+    
+    def unlink(self):
+        self.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _stress_key(i):
+    state = (12, i % 13, 12, i // 13 % 13, i // 169 % 32 - 16, 0, 0, 0)
+    return state, (5, 0, 4, 1)
+
+
+def _stress_worker(table, worker_id, num_keys, rounds):
+    for _ in range(rounds):
+        for i in range(num_keys):
+            table.add(_stress_key(i), 1.0)
+        table[_stress_key(num_keys + worker_id)] = float(worker_id)
+
+
+def stress_test(num_workers=8, num_keys=2000, rounds=25):
+    table = SharedValueTable(8, capacity=1 << 16, num_stripes=16)
+    
+    start = time.perf_counter()
+    workers = [
+        multiprocessing.Process(target=_stress_worker, args=(table, w, num_keys, rounds))
+        for w in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    
+    expected = {_stress_key(i): float(num_workers * rounds) for i in range(num_keys)}
+    for w in range(num_workers):
+        expected[_stress_key(num_keys + w)] = float(w)
+    
+    errors = 0
+    for key, value in expected.items():
+        if table.get(key) != value:
+            errors += 1
+    
+    total_updates = num_workers * rounds * (num_keys + 1)
+    print(f"Workers: {num_workers}  updates: {total_updates}  time: {elapsed:.2f}s "
+          f"({total_updates / elapsed:.0f} updates/s)")
+    print(f"Entries: {len(table)} (expected {len(expected)})  mismatches: {errors}")
+    
+    ok = errors == 0 and len(table) == len(expected)
+    table.unlink()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if stress_test() else 1)
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+from collections import OrderedDict
+from urllib.parse import quote
+
+
+_MISSING = object()
+
+CREATE_TABLE = (
+    "CREATE TABLE IF NOT EXISTS value_table ("
+    "state TEXT NOT NULL, action INTEGER NOT NULL, value REAL NOT NULL, "
+    "PRIMARY KEY (state, action)) WITHOUT ROWID"
+)
+SELECT_VALUE = "SELECT value FROM value_table WHERE state = ? AND action = ?"
+SELECT_STATE = "SELECT action, value FROM value_table WHERE state = ?"
+SELECT_ALL = "SELECT state, action, value FROM value_table"
+COUNT_ALL = "SELECT COUNT(*) FROM value_table"
+UPSERT = (
+    "INSERT INTO value_table (state, action, value) VALUES (?, ?, ?) "
+    "ON CONFLICT (state, action) DO UPDATE SET value = excluded.value"
+)
+
+
+class SQLiteValueTable:
+    
+    def __init__(self, path, cache_size=200000, batch_size=5000, read_only=False):
+        self.path = path
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.read_only = read_only
+        
+        if read_only:
+            uri = f"file:{quote(os.path.abspath(path))}?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, cached_statements=16)
+        else:
+            db_dir = os.path.dirname(path)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir)
+            
+            self.conn = sqlite3.connect(path, cached_statements=16)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(CREATE_TABLE)
+            self.conn.commit()
+        
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.pending_by_state = {}
+    
+    def _encode_state(self, state):
+        return ",".join(map(str, state))
+    
+    def _decode_state(self, text):
+        return tuple(int(v) for v in text.split(","))
+    
+    def _encode_action(self, action):
+        from_row, from_col, to_row, to_col = action
+        return ((from_row * 16 + from_col) * 16 + to_row) * 16 + to_col
+    
+    def _decode_action(self, code):
+        return (code >> 12, (code >> 8) & 15, (code >> 4) & 15, code & 15)
+    
+    def _remember(self, key, value):
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+    
+    def get(self, key, default=None):
+        value = self.cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.pending.get(key, _MISSING)
+            if value is _MISSING:
+                state, action = key
+                row = self.conn.execute(
+                    SELECT_VALUE, (self._encode_state(state), self._encode_action(action))
+                ).fetchone()
+                value = row[0] if row is not None else None
+            self._remember(key, value)
+        
+        if value is None:
+            return default
+        return value
+    
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+    
+    def __contains__(self, key):
+        return self.get(key) is not None
+    
+    def __setitem__(self, key, value):
+        self._remember(key, value)
+        self.pending[key] = value
+        
+        state, action = key
+        self.pending_by_state.setdefault(state, {})[action] = value
+        
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+    
+    def state_items(self, state):
+        rows = self.conn.execute(SELECT_STATE, (self._encode_state(state),)).fetchall()
+        
+        values = {self._decode_action(code): value for code, value in rows}
+        values.update(self.pending_by_state.get(state, {}))
+        return list(values.items())
+    
+    def flush(self):
+        if not self.pending:
+            return
+        
+        rows = [
+            (self._encode_state(state), self._encode_action(action), value)
+            for (state, action), value in self.pending.items()
+        ]
+        with self.conn:
+            self.conn.executemany(UPSERT, rows)
+        
+        self.pending = {}
+        self.pending_by_state = {}
+    
+    def __len__(self):
+        self.flush()
+        return self.conn.execute(COUNT_ALL).fetchone()[0]
+    
+    def items(self):
+        self.flush()
+        for state, action, value in self.conn.execute(SELECT_ALL):
+            yield (self._decode_state(state), self._decode_action(action)), value
+    
+    def close(self):
+        self.flush()
+        self.conn.close()
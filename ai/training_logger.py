@@ -1,8 +1,12 @@
 import json
 import csv
 import os
+import time
 from datetime import datetime
 
+from ai.memory_report import append_report
+from ai.metrics_server import MetricsServer
+
 
 class TrainingLogger:
     
@@ -19,8 +23,15 @@ class TrainingLogger:
         self.total_moves_in_wins = {"red": 0, "black": 0, "blue": 0, "green": 0, "yellow": 0}
         self.game_moves_list = []
         self.win_rates_history = []
+        self.termination_reasons = {}
+        self.game_reasons_list = []
         
         self.current_game_moves = 0
+        
+        self.metrics_server = None
+        self.metrics_interval = 1.0
+        self.started_at = time.perf_counter()
+        self._last_publish = (self.started_at, 0, 0)
     
     def start_game(self):
         self.games_played += 1
@@ -30,8 +41,10 @@ class TrainingLogger:
         self.current_game_moves += 1
         self.valid_move_count += 1
     
-    def end_game(self, winner):
+    def end_game(self, winner, reason="game_over"):
         self.game_moves_list.append(self.current_game_moves)
+        self.game_reasons_list.append(reason)
+        self.termination_reasons[reason] = self.termination_reasons.get(reason, 0) + 1
         
         if winner:
             self.total_wins[winner] += 1
@@ -55,13 +68,15 @@ class TrainingLogger:
             "total_wins": self.total_wins,
             "valid_move_count": self.valid_move_count,
             "avg_moves_to_win": avg_moves_to_win,
-            "avg_moves_per_game": self.valid_move_count / max(1, self.games_played)
+            "avg_moves_per_game": self.valid_move_count / max(1, self.games_played),
+            "termination_reasons": self.termination_reasons
         }
     
     def save_session_json(self):
         stats = self.get_stats()
         stats["win_rates_history"] = self.win_rates_history[-1000:]
         stats["game_moves"] = self.game_moves_list[-1000:]
+        stats["game_reasons"] = self.game_reasons_list[-1000:]
         
         filepath = os.path.join(self.log_dir, f"session_{self.session_id}.json")
         with open(filepath, "w") as f:
@@ -75,7 +90,7 @@ class TrainingLogger:
         with open(filepath, "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow([
-                "game_number", "moves_in_game", "win_rate"
+                "game_number", "moves_in_game", "win_rate", "termination"
             ])
             
             for i in range(len(self.game_moves_list)):
@@ -84,7 +99,8 @@ class TrainingLogger:
                 writer.writerow([
                     i + 1,
                     self.game_moves_list[i],
-                    round(win_rate, 4)
+                    round(win_rate, 4),
+                    self.game_reasons_list[i]
                 ])
         
         return filepath
@@ -113,6 +129,11 @@ class TrainingLogger:
             f.write(f"  Total Valid Moves: {stats['valid_move_count']}\n")
             f.write(f"  Avg Moves/Game: {stats['avg_moves_per_game']:.1f}\n")
             
+            f.write(f"\nTERMINATION REASONS:\n")
+            f.write("-" * 40 + "\n")
+            for reason, count in stats["termination_reasons"].items():
+                f.write(f"  {reason}: {count}\n")
+            
             f.write(f"\nAVG MOVES TO WIN:\n")
             f.write("-" * 40 + "\n")
             for color, avg in stats["avg_moves_to_win"].items():
@@ -123,6 +144,67 @@ class TrainingLogger:
         
         return filepath
     
+    def log_memory(self, report):
+        report = dict(report, games_played=self.games_played)
+        filepath = os.path.join(self.log_dir, f"memory_{self.session_id}.jsonl")
+        return append_report(filepath, report)
+    
+    def start_metrics_server(self, port=9100, interval=1.0):
+        self.metrics_server = MetricsServer(port).start()
+        self.metrics_interval = interval
+        return self.metrics_server.port
+    
+    def stop_metrics_server(self):
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+    
+    def metrics_due(self):
+        if self.metrics_server is None:
+            return False
+        return time.perf_counter() - self._last_publish[0] >= self.metrics_interval
+    
+    def publish_metrics(self, exploration_rates=None, table_entries=None, phase_seconds=None):
+        if self.metrics_server is None:
+            return
+        
+        now = time.perf_counter()
+        last_time, last_games, last_plies = self._last_publish
+        elapsed = max(now - last_time, 1e-9)
+        self._last_publish = (now, self.games_played, self.valid_move_count)
+        
+        played = max(1, self.games_played)
+        snapshot = {
+            "games_total": ("counter", "Self-play games started", self.games_played),
+            "plies_total": ("counter", "Moves played", self.valid_move_count),
+            "games_per_second": ("gauge", "Games per second since the last publish",
+                                 (self.games_played - last_games) / elapsed),
+            "plies_per_second": ("gauge", "Moves per second since the last publish",
+                                 (self.valid_move_count - last_plies) / elapsed),
+            "uptime_seconds": ("gauge", "Seconds since the logger was created",
+                               now - self.started_at),
+            "wins_total": ("counter", "Games won per color",
+                           {"label": "color", "values": dict(self.total_wins)}),
+            "win_rate": ("gauge", "Fraction of games won per color", {
+                "label": "color",
+                "values": {c: w / played for c, w in self.total_wins.items()},
+            }),
+            "terminations_total": ("counter", "Finished games per termination reason",
+                                   {"label": "reason", "values": dict(self.termination_reasons)}),
+        }
+        
+        if exploration_rates is not None:
+            snapshot["exploration_rate"] = ("gauge", "Agent exploration rate",
+                                            {"label": "color", "values": exploration_rates})
+        if table_entries is not None:
+            snapshot["table_entries"] = ("gauge", "Value table entries",
+                                         {"label": "color", "values": table_entries})
+        if phase_seconds is not None:
+            snapshot["phase_seconds_total"] = ("counter", "Time spent per training phase",
+                                               {"label": "phase", "values": phase_seconds})
+        
+        self.metrics_server.publish(snapshot)
+    
     def save_all(self):
         json_path = self.save_session_json()
         csv_path = self.save_training_csv()
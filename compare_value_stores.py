@@ -0,0 +1,119 @@
+import argparse
+import random
+import time
+
+from ai.memory_report import agent_report
+from ai.packed_table import PackedValueTable
+from train import SelfPlayTrainer
+
+
+PACKED_FORMATS = {"packed": "fixed", "packed_half": "half"}
+
+
+def quantized_copy(table, board_size, value_format):
+    packed = PackedValueTable(board_size, capacity=len(table), value_format=value_format)
+    for key, value in table.items():
+        packed[key] = value
+    return packed
+
+
+def greedy_agreement(reference, table):
+    by_state = {}
+    for (state, action), value in reference.items():
+        by_state.setdefault(state, []).append((action, value))
+    
+    agree = 0
+    for state, entries in by_state.items():
+        best = max(value for _, value in entries)
+        expected = {action for action, value in entries if value == best}
+        values = [(action, table.get((state, action), 0.0)) for action, _ in entries]
+        best = max(value for _, value in values)
+        if {action for action, value in values if value == best} == expected:
+            agree += 1
+    
+    return agree / len(by_state) if by_state else 1.0
+
+
+def measure(label, trainer, args, train_seconds, reference=None):
+    reports = [agent_report(agent) for agent in trainer.ai_agents.values()]
+    entries = sum(report["entries"] for report in reports)
+    table_bytes = sum((report["approx_bytes"] or 0) + (report["cache_bytes"] or 0)
+                      for report in reports)
+    
+    result = trainer.evaluate_against_random(num_games=args.eval_games,
+                                             num_workers=args.workers, seed=args.seed)
+    row = {
+        "label": label,
+        "entries": entries,
+        "bytes_per_entry": table_bytes / entries if entries else 0.0,
+        "win_rate": result["win_rate"],
+        "ci": result["ci"],
+        "games": result["games"],
+        "train_seconds": train_seconds,
+        "agreement": None,
+    }
+    if reference is not None:
+        agreements = [
+            greedy_agreement(reference[color], agent.value_table)
+            for color, agent in trainer.ai_agents.items()
+        ]
+        row["agreement"] = sum(agreements) / len(agreements)
+    return row
+
+
+def train_store(store, args):
+    random.seed(args.seed)
+    trainer = SelfPlayTrainer(game_mode=args.mode, log_dir=args.log_dir, value_store=store)
+    start = time.perf_counter()
+    trainer.train(num_games=args.games, save_interval=args.games, verbose=False)
+    return trainer, time.perf_counter() - start
+
+
+def format_rows(rows):
+    lines = [f"{'Value table':<28} {'Entries':>8} {'B/entry':>8} {'Win rate':>9} "
+             f"{'95% CI':>13} {'Games':>6} {'Train s':>8} {'Greedy =':>9}"]
+    for row in rows:
+        low, high = row["ci"]
+        agreement = "" if row["agreement"] is None else f"{row['agreement'] * 100:.1f}%"
+        lines.append(
+            f"{row['label']:<28} {row['entries']:>8} {row['bytes_per_entry']:>8.1f} "
+            f"{row['win_rate']:>8.1f}% {low:>6.1f}-{high:<6.1f} {row['games']:>6} "
+            f"{row['train_seconds']:>8.1f} {agreement:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare packed value tables against the float64 dict in an evaluation run"
+    )
+    parser.add_argument("--mode", default="classic", choices=["classic", "four_player"])
+    parser.add_argument("--games", type=int, default=1000, help="training games per store")
+    parser.add_argument("--eval-games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-dir", default="training_logs/value_stores")
+    args = parser.parse_args()
+    
+    rows = []
+    baseline, seconds = train_store("memory", args)
+    reference = {color: agent.value_table for color, agent in baseline.ai_agents.items()}
+    rows.append(measure("memory (float64 dict)", baseline, args, seconds))
+    
+    for store, value_format in PACKED_FORMATS.items():
+        tables = {
+            color: quantized_copy(table, baseline.board_size, value_format)
+            for color, table in reference.items()
+        }
+        trainer = SelfPlayTrainer(game_mode=args.mode, log_dir=args.log_dir, value_tables=tables)
+        rows.append(measure(f"{store} (quantized copy)", trainer, args, 0.0, reference))
+    
+    for store in PACKED_FORMATS:
+        trainer, seconds = train_store(store, args)
+        rows.append(measure(f"{store} (trained)", trainer, args, seconds))
+    
+    print(format_rows(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import socket
+import threading
+import time
+
+from ai.agent import LearningAgent
+from ai.offline_learner import OfflineLearner
+from train import EXPLORATION_DECAY_GAMES, SelfPlayTrainer
+
+
+def send_message(writer, message):
+    writer.write(json.dumps(message) + "\n")
+    writer.flush()
+
+
+def encode_table(table, keys=None):
+    if keys is None:
+        return [[state, action, value] for (state, action), value in table.items()]
+    return [[state, action, table[(state, action)]] for state, action in keys]
+
+
+def decode_transitions(rows):
+    return [
+        (color, tuple(state), tuple(action), reward, tuple(new_state))
+        for color, state, action, reward, new_state in rows
+    ]
+
+
+class ActorAgent(LearningAgent):
+    
+    def __init__(self, color, outbox, **kwargs):
+        super().__init__(color, **kwargs)
+        self.outbox = outbox
+    
+    def update(self, state, action, reward, new_state):
+        self.outbox.append([self.color, state, action, reward, new_state])
+
+
+def _receive(reader, inbox):
+    for line in reader:
+        inbox.put(json.loads(line))
+    inbox.put(None)
+
+
+def run_actor(host, port, num_games, game_mode="classic", seed=None,
+              batch_games=10, log_dir="training_logs", decay_interval=EXPLORATION_DECAY_GAMES):
+    sock = socket.create_connection((host, port))
+    reader = sock.makefile("r")
+    writer = sock.makefile("w")
+    
+    inbox = queue.Queue()
+    threading.Thread(target=_receive, args=(reader, inbox), daemon=True).start()
+    
+    if seed is not None:
+        random.seed(seed)
+    
+    trainer = SelfPlayTrainer(game_mode=game_mode, log_dir=log_dir)
+    outbox = []
+    for color in trainer.players:
+        trainer.ai_agents[color] = ActorAgent(
+            color, outbox, learning_rate=0.1, discount_factor=0.95, exploration_rate=0.3
+        )
+    
+    send_message(writer, {"type": "hello", "players": trainer.players})
+    
+    def apply(message):
+        for color, rows in message["tables"].items():
+            agent = trainer.ai_agents[color]
+            for state, action, value in rows:
+                agent.set_value(tuple(state), tuple(action), value)
+    
+    def receive(block):
+        while block or not inbox.empty():
+            message = inbox.get()
+            if message is None:
+                return False
+            apply(message)
+            block = False
+        return True
+    
+    games = plies = 0
+    played = 0
+    try:
+        if not receive(True):
+            return
+        
+        for game_num in range(1, num_games + 1):
+            if not receive(False):
+                return
+            
+            before = trainer.logger.valid_move_count
+            trainer.play_game()
+            trainer.decay_exploration(game_num, decay_interval)
+            games += 1
+            plies += trainer.logger.valid_move_count - before
+            
+            if game_num % batch_games == 0 or game_num == num_games:
+                send_message(writer, {
+                    "type": "transitions", "games": games, "plies": plies, "rows": outbox
+                })
+                outbox.clear()
+                games = plies = 0
+            played = game_num
+    finally:
+        if played < num_games:
+            print(f"Actor stopped after {played} of {num_games} games")
+        try:
+            send_message(writer, {"type": "done"})
+        except OSError:
+            pass
+        sock.close()
+
+
+class Learner:
+    
+    def __init__(self, game_mode="classic", host="127.0.0.1", port=0,
+                 broadcast_interval=1.0, save_dir=None):
+        self.game_mode = game_mode
+        self.broadcast_interval = broadcast_interval
+        self.save_dir = save_dir
+        
+        if game_mode == "classic":
+            self.players = ["red", "black"]
+        else:
+            self.players = ["red", "blue", "green", "yellow"]
+        
+        self.agents = {}
+        for color in self.players:
+            agent = LearningAgent(color, learning_rate=0.1, discount_factor=0.95)
+            if save_dir:
+                agent.load(os.path.join(save_dir, f"agent_{color}.json"))
+            self.agents[color] = agent
+        self.offline = OfflineLearner(self.agents)
+        
+        self.server = socket.create_server((host, port))
+        self.port = self.server.getsockname()[1]
+        self.inbox = queue.Queue()
+        self.writers = {}
+        
+        self.games = 0
+        self.plies = 0
+        self.broadcasts = 0
+        self.elapsed = 0.0
+    
+    def _read_actor(self, actor_id, conn):
+        reader = conn.makefile("r")
+        try:
+            for line in reader:
+                self.inbox.put((actor_id, json.loads(line)))
+        finally:
+            self.inbox.put((actor_id, None))
+    
+    def serve(self, num_actors):
+        for actor_id in range(num_actors):
+            conn, _ = self.server.accept()
+            self.writers[actor_id] = conn.makefile("w")
+            threading.Thread(target=self._read_actor, args=(actor_id, conn), daemon=True).start()
+        
+        start = time.perf_counter()
+        last_broadcast = start
+        changed = {color: set() for color in self.players}
+        active = set(self.writers)
+        
+        while active:
+            try:
+                actor_id, message = self.inbox.get(timeout=self.broadcast_interval)
+            except queue.Empty:
+                message = {"type": "idle"}
+                actor_id = None
+            
+            if message is None or message["type"] == "done":
+                active.discard(actor_id)
+            elif message["type"] == "hello":
+                tables = {
+                    color: encode_table(agent.value_table)
+                    for color, agent in self.agents.items()
+                }
+                send_message(self.writers[actor_id], {"type": "snapshot", "tables": tables})
+            elif message["type"] == "transitions":
+                batch = decode_transitions(message["rows"])
+                self.offline.apply_batch(batch)
+                for color, state, action, _, _ in batch:
+                    changed[color].add((state, action))
+                self.games += message["games"]
+                self.plies += message["plies"]
+            
+            now = time.perf_counter()
+            if now - last_broadcast >= self.broadcast_interval:
+                self._broadcast(changed, active)
+                changed = {color: set() for color in self.players}
+                last_broadcast = now
+        
+        self.elapsed = time.perf_counter() - start
+        self.server.close()
+        
+        if self.save_dir:
+            for color, agent in self.agents.items():
+                agent.save(os.path.join(self.save_dir, f"agent_{color}.json"))
+    
+    def _broadcast(self, changed, active):
+        if not any(changed.values()):
+            return
+        
+        tables = {
+            color: encode_table(self.agents[color].value_table, keys)
+            for color, keys in changed.items() if keys
+        }
+        for actor_id in active:
+            try:
+                send_message(self.writers[actor_id], {"type": "delta", "tables": tables})
+            except OSError:
+                pass
+        self.broadcasts += 1
+    
+    def report(self):
+        elapsed = max(self.elapsed, 1e-9)
+        return (
+            f"{self.games} games, {self.plies} plies, "
+            f"{self.offline.transitions_applied} transitions in {self.elapsed:.1f}s | "
+            f"{self.games / elapsed:.1f} games/sec, {self.plies / elapsed:.0f} plies/sec, "
+            f"{self.broadcasts} broadcasts"
+        )
+
+
+def run_local(num_actors, games_per_actor, game_mode="classic", save_dir=None,
+              log_dir="training_logs"):
+    learner = Learner(game_mode, save_dir=save_dir)
+    
+    actors = []
+    decay_interval = max(1, EXPLORATION_DECAY_GAMES // num_actors)
+    for actor_id in range(num_actors):
+        actors.append(multiprocessing.Process(
+            target=run_actor,
+            args=("127.0.0.1", learner.port, games_per_actor, game_mode, actor_id),
+            kwargs={"log_dir": os.path.join(log_dir, f"actor_{actor_id}"),
+                    "decay_interval": decay_interval}
+        ))
+    
+    for actor in actors:
+        actor.start()
+    learner.serve(num_actors)
+    for actor in actors:
+        actor.join()
+    
+    return learner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed actor/learner self-play")
+    subparsers = parser.add_subparsers(dest="role", required=True)
+    
+    local = subparsers.add_parser("local", help="run the learner and actors on this machine")
+    local.add_argument("actors", type=int)
+    local.add_argument("games", type=int, help="games per actor")
+    
+    learner = subparsers.add_parser("learner", help="own the value tables and serve actors")
+    learner.add_argument("actors", type=int)
+    learner.add_argument("--host", default="0.0.0.0")
+    learner.add_argument("--port", type=int, default=5555)
+    
+    actor = subparsers.add_parser("actor", help="play games and stream transitions")
+    actor.add_argument("host")
+    actor.add_argument("games", type=int)
+    actor.add_argument("--port", type=int, default=5555)
+    actor.add_argument("--decay-interval", type=int, default=EXPLORATION_DECAY_GAMES,
+                       help="games between exploration decays; divide by the actor count")
+    
+    for sub in (local, learner, actor):
+        sub.add_argument("--mode", default="classic", choices=["classic", "four_player"])
+    for sub in (local, learner):
+        sub.add_argument("--save-dir", default=None)
+    
+    args = parser.parse_args()
+    
+    if args.role == "actor":
+        run_actor(args.host, args.port, args.games, args.mode,
+                  decay_interval=args.decay_interval)
+        return
+    
+    if args.role == "local":
+        result = run_local(args.actors, args.games, args.mode, args.save_dir)
+    else:
+        result = Learner(args.mode, args.host, args.port, save_dir=args.save_dir)
+        print(f"Learner listening on port {result.port} for {args.actors} actors")
+        result.serve(args.actors)
+    
+    print(result.report())
+
+
+if __name__ == "__main__":
+    main()
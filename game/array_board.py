@@ -0,0 +1,135 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from game.piece import Piece
+from game.board import Board, COLORS, MODE_COLORS, reaches_king_row
+
+
+_INITIAL_CELLS = {}
+_VALID_MASKS = {}
+
+
+def encode_piece(piece):
+    return (COLORS.index(piece.color) + 1) * 2 + (1 if piece.is_king else 0)
+
+
+def _initial_cells(size, game_mode):
+    key = (size, game_mode)
+    if key not in _INITIAL_CELLS:
+        cells = np.array(Board(size, game_mode).get_state_key(), dtype=np.int8)
+        _INITIAL_CELLS[key] = cells.reshape(size, size)
+    return _INITIAL_CELLS[key]
+
+
+def _valid_mask(size, game_mode):
+    key = (size, game_mode)
+    if key not in _VALID_MASKS:
+        mask = np.ones((size, size), dtype=bool)
+        if game_mode == 'four_player':
+            mask[:3, :3] = False
+            mask[:3, 9:] = False
+            mask[9:, :3] = False
+            mask[9:, 9:] = False
+        mask.setflags(write=False)
+        _VALID_MASKS[key] = (mask, mask.tolist())
+    return _VALID_MASKS[key]
+
+
+class ArrayBoard:
+    
+    def __init__(self, size=8, game_mode='classic', cells=None):
+        if np is None:
+            raise ImportError("ArrayBoard requires numpy")
+        
+        self.size = size
+        self.game_mode = game_mode
+        self.colors = MODE_COLORS[game_mode]
+        self.valid_mask, self._valid_rows = _valid_mask(size, game_mode)
+        
+        if cells is None:
+            cells = _initial_cells(size, game_mode)
+        self.cells = cells.copy()
+        
+        self._piece_at = {}
+        self._pieces = None
+        self.version = 0
+        self.feature_cache = {}
+        self.threats = None
+    
+    @property
+    def pieces(self):
+        if self._pieces is None:
+            pieces = {color: [] for color in self.colors}
+            rows, cols = np.nonzero(self.cells)
+            for row, col in zip(rows.tolist(), cols.tolist()):
+                piece = self._get_or_create(row, col)
+                pieces[piece.color].append(piece)
+            self._pieces = pieces
+        return self._pieces
+    
+    def _get_or_create(self, row, col):
+        piece = self._piece_at.get((row, col))
+        if piece is None:
+            code = int(self.cells[row, col])
+            piece = Piece(COLORS[code // 2 - 1], row, col)
+            if code & 1:
+                piece.make_king()
+            self._piece_at[(row, col)] = piece
+        return piece
+    
+    def is_valid_square(self, row, col):
+        if row < 0 or row >= self.size or col < 0 or col >= self.size:
+            return False
+        return self._valid_rows[row][col]
+    
+    def get_piece(self, row, col):
+        if not self.is_valid_square(row, col):
+            return None
+        return self.piece_at(row, col)
+    
+    def piece_at(self, row, col):
+        if self.cells[row, col] == 0:
+            return None
+        return self._get_or_create(row, col)
+    
+    def move_piece(self, piece, new_row, new_col):
+        old_square = (piece.row, piece.col)
+        self.cells[piece.row, piece.col] = 0
+        self._piece_at.pop((piece.row, piece.col), None)
+        
+        piece.move(new_row, new_col)
+        if reaches_king_row(piece, self.game_mode):
+            piece.make_king()
+        
+        self.cells[new_row, new_col] = encode_piece(piece)
+        self._piece_at[(new_row, new_col)] = piece
+        self._touch(old_square, (new_row, new_col))
+    
+    def _touch(self, *squares):
+        self._pieces = None
+        self.version += 1
+        self.feature_cache = {}
+        if self.threats is not None:
+            self.threats.mark(squares)
+    
+    def remove_piece(self, piece):
+        if self._piece_at.get((piece.row, piece.col)) is not piece:
+            return
+        
+        self.cells[piece.row, piece.col] = 0
+        del self._piece_at[(piece.row, piece.col)]
+        self._touch((piece.row, piece.col))
+    
+    def get_all_pieces(self, color):
+        return self.pieces.get(color, [])
+    
+    def copy(self):
+        new_board = ArrayBoard(self.size, self.game_mode, self.cells)
+        if self.threats is not None:
+            new_board.threats = self.threats.copy(new_board)
+        return new_board
+    
+    def get_state_key(self):
+        return self.cells.tobytes()
@@ -1,4 +1,41 @@
 from game.piece import Piece
+from game.geometry import is_playable
+
+
+COLORS = ['red', 'black', 'blue', 'green', 'yellow']
+MODE_COLORS = {
+    'classic': ['red', 'black'],
+    'four_player': ['red', 'blue', 'green', 'yellow'],
+}
+
+
+def reaches_king_row(piece, game_mode):
+    if piece.is_king:
+        return False
+    
+    if game_mode == 'classic':
+        if piece.color == 'red':
+            return piece.row == 0
+        if piece.color == 'black':
+            return piece.row == 7
+    else:
+        if piece.color == 'red':
+            return piece.row <= 2
+        if piece.color == 'blue':
+            return piece.row >= 9
+        if piece.color == 'green':
+            return piece.col >= 9
+        if piece.color == 'yellow':
+            return piece.col <= 2
+    
+    return False
+
+
+def create_board(size=8, game_mode='classic', backend='list'):
+    if backend == 'numpy':
+        from game.array_board import ArrayBoard
+        return ArrayBoard(size, game_mode)
+    return Board(size, game_mode)
 
 
 class Board:
@@ -8,6 +45,9 @@ class Board:
         self.game_mode = game_mode
         self.grid = [[None for _ in range(size)] for _ in range(size)]
         self.pieces = {}
+        self.version = 0
+        self.feature_cache = {}
+        self.threats = None
         
         if game_mode == 'classic':
             self._setup_classic()
@@ -63,56 +103,40 @@ class Board:
                     self.pieces['yellow'].append(piece)
     
     def is_valid_square(self, row, col):
-        if row < 0 or row >= self.size or col < 0 or col >= self.size:
-            return False
-        
-        if self.game_mode == 'four_player':
-            if row < 3 and col < 3:
-                return False
-            if row < 3 and col >= 9:
-                return False
-            if row >= 9 and col < 3:
-                return False
-            if row >= 9 and col >= 9:
-                return False
-        
-        return True
+        return is_playable(self.size, self.game_mode, row, col)
     
     def get_piece(self, row, col):
         if not self.is_valid_square(row, col):
             return None
         return self.grid[row][col]
     
+    def piece_at(self, row, col):
+        return self.grid[row][col]
+    
     def move_piece(self, piece, new_row, new_col):
+        old_square = (piece.row, piece.col)
         self.grid[piece.row][piece.col] = None
         piece.move(new_row, new_col)
         self.grid[new_row][new_col] = piece
         self._check_promotion(piece)
+        self._touch(old_square, (new_row, new_col))
+    
+    def _touch(self, *squares):
+        self.version += 1
+        self.feature_cache = {}
+        if self.threats is not None:
+            self.threats.mark(squares)
     
     def _check_promotion(self, piece):
-        if piece.is_king:
-            return
-        
-        if self.game_mode == 'classic':
-            if piece.color == 'red' and piece.row == 0:
-                piece.make_king()
-            elif piece.color == 'black' and piece.row == 7:
-                piece.make_king()
-        else:
-            if piece.color == 'red' and piece.row <= 2:
-                piece.make_king()
-            elif piece.color == 'blue' and piece.row >= 9:
-                piece.make_king()
-            elif piece.color == 'green' and piece.col >= 9:
-                piece.make_king()
-            elif piece.color == 'yellow' and piece.col <= 2:
-                piece.make_king()
+        if reaches_king_row(piece, self.game_mode):
+            piece.make_king()
     
     def remove_piece(self, piece):
         self.grid[piece.row][piece.col] = None
         if piece.color in self.pieces:
             if piece in self.pieces[piece.color]:
                 self.pieces[piece.color].remove(piece)
+        self._touch((piece.row, piece.col))
     
     def get_all_pieces(self, color):
         return self.pieces.get(color, [])
@@ -128,6 +152,8 @@ class Board:
                 new_board.grid[new_piece.row][new_piece.col] = new_piece
                 new_board.pieces[color].append(new_piece)
         
+        if self.threats is not None:
+            new_board.threats = self.threats.copy(new_board)
         return new_board
     
     def get_state_key(self):
@@ -138,8 +164,7 @@ class Board:
                 if piece is None:
                     state.append(0)
                 else:
-                    colors = ['red', 'black', 'blue', 'green', 'yellow']
-                    color_idx = colors.index(piece.color) + 1
+                    color_idx = COLORS.index(piece.color) + 1
                     value = color_idx * 2 + (1 if piece.is_king else 0)
                     state.append(value)
         return tuple(state)
@@ -0,0 +1,63 @@
+import random
+import sys
+import time
+
+from game.board import Board
+from game.piece import Piece
+from game.rules import Rules
+
+
+def lattice_position(size, game_mode, span, thin=0.0, seed=0,
+                     king_color='red', enemy_color='black'):
+    board = Board(size, game_mode)
+    board.grid = [[None for _ in range(size)] for _ in range(size)]
+    board.pieces = {king_color: [], enemy_color: []}
+    
+    def place(color, row, col):
+        piece = Piece(color, row, col)
+        board.grid[row][col] = piece
+        board.pieces[color].append(piece)
+        return piece
+    
+    rng = random.Random(seed)
+    low = (size - span) // 2
+    for row in range(low, low + span):
+        for col in range(low, low + span):
+            if row % 2 == 0 and (row + col) % 2 == 1 and board.is_valid_square(row, col):
+                if rng.random() >= thin:
+                    place(enemy_color, row, col)
+    
+    row = size // 2 if (size // 2) % 2 == 1 else size // 2 - 1
+    col = size // 2 if (row + size // 2) % 2 == 1 else size // 2 - 1
+    board.grid[row][col] = None
+    king = place(king_color, row, col)
+    king.make_king()
+    return board, king
+
+
+def bench(size, game_mode, span, repeats, thin=0.0, seed=0):
+    board, king = lattice_position(size, game_mode, span, thin, seed)
+    enemies = len(board.pieces['black'])
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        moves = Rules(board).get_valid_moves(king)
+    elapsed = (time.perf_counter() - start) / repeats
+    
+    longest = max((len(captured) for captured in moves.values()), default=0)
+    print(f"{game_mode} {size}x{size} span {span} thin {thin} seed {seed}: {enemies} enemies, "
+          f"{len(moves)} destinations, longest chain {longest}, {elapsed * 1000:.3f} ms")
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for span in (4, 6, 8):
+        bench(8, 'classic', span, repeats)
+    for span in (6, 8, 10, 12):
+        bench(12, 'four_player', span, repeats)
+    for seed in (33, 51, 69):
+        bench(12, 'four_player', 12, repeats, thin=0.3, seed=seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+DIAGONALS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+ALL_DIRECTIONS = (0, 1, 2, 3)
+FORWARD_DIRECTIONS = {-1: (0, 1), 1: (2, 3)}
+
+_GEOMETRIES = {}
+
+
+def is_playable(size, game_mode, row, col):
+    if row < 0 or row >= size or col < 0 or col >= size:
+        return False
+    
+    if game_mode == 'four_player':
+        corner_row = row < 3 or row >= size - 3
+        corner_col = col < 3 or col >= size - 3
+        if corner_row and corner_col:
+            return False
+    
+    return True
+
+
+class Geometry:
+    
+    def __init__(self, size, game_mode):
+        self.size = size
+        self.game_mode = game_mode
+        self.steps = [None] * (size * size)
+        self.jumps = [None] * (size * size)
+        self.neighborhoods = [None] * (size * size)
+        
+        for row in range(size):
+            for col in range(size):
+                if (row + col) % 2 == 0 or not is_playable(size, game_mode, row, col):
+                    continue
+                
+                steps = []
+                jumps = []
+                for d_row, d_col in DIAGONALS:
+                    step = (row + d_row, col + d_col)
+                    land = (row + 2 * d_row, col + 2 * d_col)
+                    
+                    if is_playable(size, game_mode, *step):
+                        steps.append(step)
+                        jumps.append((step, land) if is_playable(size, game_mode, *land) else None)
+                    else:
+                        steps.append(None)
+                        jumps.append(None)
+                
+                square = row * size + col
+                self.steps[square] = tuple(steps)
+                self.jumps[square] = tuple(jumps)
+                self.neighborhoods[square] = tuple(
+                    (row + k * d_row, col + k * d_col)
+                    for d_row, d_col in DIAGONALS for k in (1, 2)
+                    if is_playable(size, game_mode, row + k * d_row, col + k * d_col)
+                ) + ((row, col),)
+    
+    def square(self, row, col):
+        return row * self.size + col
+
+
+def geometry_for(size, game_mode):
+    key = (size, game_mode)
+    geometry = _GEOMETRIES.get(key)
+    if geometry is None:
+        geometry = _GEOMETRIES[key] = Geometry(size, game_mode)
+    return geometry
+
+
+def piece_directions(piece):
+    if piece.is_king:
+        return ALL_DIRECTIONS
+    return FORWARD_DIRECTIONS[piece.get_direction()[0]]
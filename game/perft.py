@@ -0,0 +1,50 @@
+import sys
+import time
+
+from game.board import create_board, MODE_COLORS
+from game.rules import Rules
+
+
+def _play(board, piece, destination, captured):
+    child = board.copy()
+    child_piece = child.get_piece(piece.row, piece.col)
+    child_captured = [child.get_piece(c.row, c.col) for c in captured]
+    Rules(child).execute_move(child_piece, destination, child_captured)
+    return child
+
+
+def perft(board, colors, depth, turn=0):
+    if depth == 0:
+        return 1
+    
+    color = colors[turn % len(colors)]
+    moves = Rules(board).get_all_valid_moves(color)
+    if not moves:
+        return 1
+    
+    if depth == 1:
+        return sum(len(destinations) for destinations in moves.values())
+    
+    nodes = 0
+    for piece, destinations in moves.items():
+        for destination, captured in destinations.items():
+            child = _play(board, piece, destination, captured)
+            nodes += perft(child, colors, depth - 1, turn + 1)
+    return nodes
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    backend = sys.argv[2] if len(sys.argv) > 2 else 'list'
+    
+    for game_mode, size in (('classic', 8), ('four_player', 12)):
+        colors = MODE_COLORS[game_mode]
+        for d in range(1, depth + 1):
+            start = time.perf_counter()
+            nodes = perft(create_board(size, game_mode, backend), colors, d)
+            elapsed = time.perf_counter() - start
+            print(f"{game_mode} perft({d}) = {nodes} ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
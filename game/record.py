@@ -0,0 +1,189 @@
+import os
+import struct
+
+
+MAGIC = b"CKGR"
+VERSION = 1
+
+GAME_MODES = ['classic', 'four_player']
+COLORS = ['red', 'black', 'blue', 'green', 'yellow']
+REASONS = ['game_over', 'max_moves', 'repetition', 'no_progress', 'adjudicated']
+NO_WINNER = 0xFF
+
+HEADER = struct.Struct("<BBBBIH")
+MAX_CAPTURE_CODE = 3
+
+
+def board_size_for_mode(game_mode):
+    return 8 if game_mode == 'classic' else 12
+
+
+def _dark_index(row, col, size):
+    return (row * size + col) // 2
+
+
+def _dark_square(index, size):
+    half = size // 2
+    row = index // half
+    col = (index % half) * 2 + (1 - row % 2)
+    return (row, col)
+
+
+class GameRecord:
+    
+    def __init__(self, game_mode, seed, players, moves, winner=None, reason='game_over'):
+        self.game_mode = game_mode
+        self.seed = seed
+        self.players = list(players)
+        self.moves = moves
+        self.winner = winner
+        self.reason = reason
+    
+    def encode(self):
+        size = board_size_for_mode(self.game_mode)
+        winner_code = COLORS.index(self.winner) if self.winner else NO_WINNER
+        
+        data = bytearray(HEADER.pack(
+            GAME_MODES.index(self.game_mode),
+            len(self.players),
+            winner_code,
+            REASONS.index(self.reason),
+            self.seed & 0xFFFFFFFF,
+            len(self.moves)
+        ))
+        data.extend(COLORS.index(color) for color in self.players)
+        
+        for (from_row, from_col), (to_row, to_col), num_captured in self.moves:
+            packed = (
+                _dark_index(from_row, from_col, size) << 9
+                | _dark_index(to_row, to_col, size) << 2
+                | min(num_captured, MAX_CAPTURE_CODE)
+            )
+            data.append(packed >> 8)
+            data.append(packed & 0xFF)
+        
+        return bytes(data)
+    
+    @classmethod
+    def decode(cls, stream):
+        header = stream.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+        
+        mode_code, num_players, winner_code, reason_code, seed, num_moves = HEADER.unpack(header)
+        game_mode = GAME_MODES[mode_code]
+        size = board_size_for_mode(game_mode)
+        
+        players = [COLORS[code] for code in stream.read(num_players)]
+        body = stream.read(2 * num_moves)
+        if len(players) < num_players or len(body) < 2 * num_moves:
+            return None
+        
+        moves = []
+        for i in range(0, len(body), 2):
+            packed = (body[i] << 8) | body[i + 1]
+            moves.append((
+                _dark_square(packed >> 9, size),
+                _dark_square((packed >> 2) & 0x7F, size),
+                packed & MAX_CAPTURE_CODE
+            ))
+        
+        winner = COLORS[winner_code] if winner_code != NO_WINNER else None
+        return cls(game_mode, seed, players, moves, winner, REASONS[reason_code])
+
+
+class GameRecordWriter:
+    
+    def __init__(self, filepath, buffer_size=1 << 20):
+        save_dir = os.path.dirname(filepath)
+        if save_dir and not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+        
+        self.filepath = filepath
+        self.file = open(filepath, "ab", buffering=buffer_size)
+        if self.file.tell() == 0:
+            self.file.write(MAGIC + bytes([VERSION]))
+        
+        self.games_written = 0
+    
+    def write(self, record):
+        self.file.write(record.encode())
+        self.games_written += 1
+    
+    def flush(self):
+        self.file.flush()
+    
+    def close(self):
+        self.file.close()
+
+
+def read_records(filepath, buffer_size=1 << 20):
+    with open(filepath, "rb", buffering=buffer_size) as f:
+        magic = f.read(len(MAGIC) + 1)
+        if magic[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{filepath} is not a game record file")
+        
+        while True:
+            record = GameRecord.decode(f)
+            if record is None:
+                return
+            yield record
+
+
+def pdn_square(row, col):
+    return (7 - row) * 4 + (7 - col) // 2 + 1
+
+
+def to_pdn(record, event="Self-play", round_number=1):
+    if record.game_mode != 'classic':
+        raise ValueError("PDN export only supports classic games")
+    
+    if record.winner == 'red':
+        result = "0-1"
+    elif record.winner == 'black':
+        result = "1-0"
+    else:
+        result = "1/2-1/2"
+    
+    lines = [
+        f'[Event "{event}"]',
+        f'[Round "{round_number}"]',
+        '[Black "red"]',
+        '[White "black"]',
+        f'[Result "{result}"]',
+        '[GameType "21"]',
+        ''
+    ]
+    
+    tokens = []
+    for i, (source, target, num_captured) in enumerate(record.moves):
+        separator = "x" if num_captured else "-"
+        move = f"{pdn_square(*source)}{separator}{pdn_square(*target)}"
+        if i % 2 == 0:
+            tokens.append(f"{i // 2 + 1}. {move}")
+        else:
+            tokens.append(move)
+    tokens.append(result)
+    
+    line = ""
+    for token in tokens:
+        if line and len(line) + len(token) + 1 > 79:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    
+    return "\n".join(lines) + "\n"
+
+
+def export_pdn(records, filepath):
+    count = 0
+    with open(filepath, "w") as f:
+        for record in records:
+            if record.game_mode != 'classic':
+                continue
+            count += 1
+            f.write(to_pdn(record, round_number=count))
+            f.write("\n")
+    return count
@@ -1,101 +1,176 @@
+import random
+from types import MappingProxyType
+
+from game.geometry import geometry_for, piece_directions
+from game.threats import ThreatMap
+
+
 class Rules:
     
     def __init__(self, board):
         self.board = board
+        self.geometry = geometry_for(board.size, board.game_mode)
+        self._cache_version = None
+        self._moves = {}
+        self._status = {}
+    
+    def _position_cache(self):
+        if self._cache_version != self.board.version:
+            self._cache_version = self.board.version
+            self._moves = {}
+            self._status = {}
+        return self._moves
     
     def get_valid_moves(self, piece):
-        moves = {}
-        captures = self._get_captures(piece, piece.row, piece.col, [])
-        
+        captures = self._get_captures(piece)
         if captures:
-            for capture_path in captures:
-                if capture_path:
-                    final_row, final_col, captured = capture_path[-1]
-                    all_captured = [c for _, _, c in capture_path]
-                    moves[(final_row, final_col)] = all_captured
-        else:
-            moves = self._get_regular_moves(piece)
-        
-        return moves
+            return captures
+        return self._get_regular_moves(piece)
     
     def _get_regular_moves(self, piece):
         moves = {}
-        directions = piece.get_direction()
+        piece_at = self.board.piece_at
+        steps = self.geometry.steps[piece.row * self.geometry.size + piece.col]
         
-        for d_row in directions:
-            for d_col in [-1, 1]:
-                new_row = piece.row + d_row
-                new_col = piece.col + d_col
-                
-                if self.board.is_valid_square(new_row, new_col):
-                    if self.board.get_piece(new_row, new_col) is None:
-                        moves[(new_row, new_col)] = []
+        for direction in piece_directions(piece):
+            step = steps[direction]
+            if step is not None and piece_at(*step) is None:
+                moves[step] = ()
         
         return moves
     
-    def _get_captures(self, piece, current_row, current_col, already_captured):
-        captures = []
-        
-        if piece.is_king:
-            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        else:
-            row_dirs = piece.get_direction()
-            directions = [(d, -1) for d in row_dirs] + [(d, 1) for d in row_dirs]
-        
-        for d_row, d_col in directions:
-            capture_row = current_row + d_row
-            capture_col = current_col + d_col
-            land_row = current_row + 2 * d_row
-            land_col = current_col + 2 * d_col
+    def _get_captures(self, piece):
+        size = self.geometry.size
+        all_jumps = self.geometry.jumps
+        piece_at = self.board.piece_at
+        directions = piece_directions(piece)
+        
+        captures = {}
+        seen = set()
+        path = []
+        stack = [(piece.row, piece.col, 0, 0, None)]
+        
+        while stack:
+            row, col, mask, depth, target = stack.pop()
+            del path[depth:]
+            if target is not None:
+                path.append(target)
             
-            if not self.board.is_valid_square(land_row, land_col):
-                continue
+            jumps = all_jumps[row * size + col]
+            extended = False
             
-            target = self.board.get_piece(capture_row, capture_col)
-            landing = self.board.get_piece(land_row, land_col)
+            for direction in reversed(directions):
+                jump = jumps[direction]
+                if jump is None:
+                    continue
+                
+                over, land = jump
+                bit = 1 << (over[0] * size + over[1])
+                if mask & bit:
+                    continue
+                
+                victim = piece_at(*over)
+                if victim is None or victim.color == piece.color:
+                    continue
+                
+                landing = piece_at(*land)
+                if landing is not None and landing is not piece:
+                    continue
+                
+                extended = True
+                state = (land, mask | bit)
+                if state not in seen:
+                    seen.add(state)
+                    stack.append((land[0], land[1], mask | bit, depth + 1, victim))
             
-            if target is not None and target.color != piece.color:
-                if target not in already_captured:
-                    if landing is None or (land_row == piece.row and land_col == piece.col):
-                        new_captured = already_captured + [target]
-                        
-                        further_captures = self._get_captures(
-                            piece, land_row, land_col, new_captured
-                        )
-                        
-                        if further_captures:
-                            for path in further_captures:
-                                captures.append([(land_row, land_col, target)] + path)
-                        else:
-                            captures.append([(land_row, land_col, target)])
+            if not extended and path:
+                destination = (row, col)
+                best = captures.get(destination)
+                if best is None or len(path) > len(best):
+                    captures[destination] = tuple(path)
         
         return captures
     
+    def threats(self):
+        threats = self.board.threats
+        if threats is None:
+            threats = self.board.threats = ThreatMap(self.board, self.geometry)
+        return threats
+    
     def has_captures(self, color):
-        for piece in self.board.get_all_pieces(color):
-            captures = self._get_captures(piece, piece.row, piece.col, [])
-            if captures:
-                return True
-        return False
+        return self.threats().has_captures(color)
+    
+    def capturing_pieces(self, color):
+        capturers = self.threats().capturing_squares(color)
+        return [p for p in self.board.get_all_pieces(color) if (p.row, p.col) in capturers]
+    
+    def iter_moves(self, color):
+        moves = self._position_cache().get(color)
+        if moves is not None:
+            for piece, destinations in moves.items():
+                for dest, captured in destinations.items():
+                    yield piece, dest, captured
+            return
+        
+        capturers = self.threats().capturing_squares(color)
+        if capturers:
+            for piece in self.capturing_pieces(color):
+                for dest, captured in self.get_valid_moves(piece).items():
+                    if captured:
+                        yield piece, dest, captured
+        else:
+            for piece in list(self.board.get_all_pieces(color)):
+                for dest, captured in self._get_regular_moves(piece).items():
+                    yield piece, dest, captured
+    
+    def random_move(self, color, rng=random):
+        chosen = None
+        for count, move in enumerate(self.iter_moves(color), 1):
+            if rng.random() * count < 1:
+                chosen = move
+        return chosen
+    
+    def has_moves(self, color):
+        moves = self._position_cache().get(color)
+        if moves is not None:
+            return bool(moves)
+        return next(self.iter_moves(color), None) is not None
     
     def get_all_valid_moves(self, color):
+        return MappingProxyType(self._valid_moves(color))
+    
+    def _valid_moves(self, color):
+        cache = self._position_cache()
+        moves = cache.get(color)
+        if moves is None:
+            moves = cache[color] = self._generate_moves(color)
+        return moves
+    
+    def _generate_moves(self, color):
         all_moves = {}
-        has_capture = self.has_captures(color)
         
-        for piece in self.board.get_all_pieces(color):
-            moves = self.get_valid_moves(piece)
-            
-            if has_capture:
-                capture_moves = {k: v for k, v in moves.items() if v}
+        if self.has_captures(color):
+            for piece in self.capturing_pieces(color):
+                capture_moves = {k: v for k, v in self.get_valid_moves(piece).items() if v}
                 if capture_moves:
-                    all_moves[piece] = capture_moves
-            else:
+                    all_moves[piece] = MappingProxyType(capture_moves)
+        else:
+            for piece in self.board.get_all_pieces(color):
+                moves = self._get_regular_moves(piece)
                 if moves:
-                    all_moves[piece] = moves
+                    all_moves[piece] = MappingProxyType(moves)
         
         return all_moves
     
     def is_game_over(self, colors):
+        self._position_cache()
+        key = tuple(colors)
+        status = self._status.get(key)
+        if status is None:
+            status = self._status[key] = self._game_status(colors)
+        return status
+    
+    def _game_status(self, colors):
         players_with_pieces = []
         players_with_moves = []
         
@@ -103,8 +178,7 @@ class Rules:
             pieces = self.board.get_all_pieces(color)
             if pieces:
                 players_with_pieces.append(color)
-                moves = self.get_all_valid_moves(color)
-                if moves:
+                if self.has_moves(color):
                     players_with_moves.append(color)
         
         if len(players_with_pieces) == 1:
@@ -119,6 +193,16 @@ class Rules:
         
         return False, None
     
+    def step(self, move, colors, next_color=None):
+        piece, destination, captured = move
+        self.execute_move(piece, destination, captured)
+        
+        game_over, winner = self.is_game_over(colors)
+        next_moves = None
+        if not game_over and next_color is not None:
+            next_moves = self.get_all_valid_moves(next_color)
+        return game_over, winner, next_moves
+    
     def execute_move(self, piece, destination, captured_pieces):
         new_row, new_col = destination
         
@@ -0,0 +1,70 @@
+from game.geometry import piece_directions
+
+
+class ThreatMap:
+    
+    def __init__(self, board, geometry, capturers=None, dirty=None):
+        self.board = board
+        self.geometry = geometry
+        self.dirty = set() if dirty is None else dirty
+        
+        if capturers is None:
+            capturers = {}
+            for color, pieces in board.pieces.items():
+                capturers[color] = {
+                    (piece.row, piece.col) for piece in pieces if self.can_capture(piece)
+                }
+        self.capturers = capturers
+    
+    def can_capture(self, piece):
+        piece_at = self.board.piece_at
+        jumps = self.geometry.jumps[piece.row * self.geometry.size + piece.col]
+        
+        for direction in piece_directions(piece):
+            jump = jumps[direction]
+            if jump is None:
+                continue
+            
+            target = piece_at(*jump[0])
+            if target is not None and target.color != piece.color:
+                if piece_at(*jump[1]) is None:
+                    return True
+        
+        return False
+    
+    def mark(self, squares):
+        self.dirty.update(squares)
+    
+    def _refresh(self):
+        if not self.dirty:
+            return
+        
+        size = self.geometry.size
+        neighborhoods = self.geometry.neighborhoods
+        affected = set()
+        for row, col in self.dirty:
+            neighborhood = neighborhoods[row * size + col]
+            if neighborhood is not None:
+                affected.update(neighborhood)
+        self.dirty = set()
+        
+        piece_at = self.board.piece_at
+        for square in affected:
+            for squares in self.capturers.values():
+                squares.discard(square)
+            
+            piece = piece_at(*square)
+            if piece is not None and self.can_capture(piece):
+                self.capturers.setdefault(piece.color, set()).add(square)
+    
+    def has_captures(self, color):
+        self._refresh()
+        return bool(self.capturers.get(color))
+    
+    def capturing_squares(self, color):
+        self._refresh()
+        return self.capturers.get(color, set())
+    
+    def copy(self, board):
+        capturers = {color: set(squares) for color, squares in self.capturers.items()}
+        return ThreatMap(board, self.geometry, capturers, set(self.dirty))
@@ -0,0 +1,92 @@
+import argparse
+import multiprocessing
+import random
+import time
+
+from game.board import Board
+from game.rules import Rules
+from ai.agent import LearningAgent
+from ai.inference_server import RemoteAgent
+
+
+def sample_requests(count, seed):
+    random.seed(seed)
+    players = ["red", "black"]
+    requests = []
+    
+    while len(requests) < count:
+        board = Board(8, "classic")
+        rules = Rules(board)
+        extractors = {color: LearningAgent(color) for color in players}
+        
+        for ply in range(200):
+            color = players[ply % 2]
+            moves = rules.get_all_valid_moves(color)
+            if not moves:
+                break
+            
+            actions = [
+                [piece.row, piece.col, dest[0], dest[1], len(captured)]
+                for piece, destinations in moves.items()
+                for dest, captured in destinations.items()
+            ]
+            requests.append((color, extractors[color].get_state_key(board), actions))
+            
+            piece, destination, captured = rules.random_move(color)
+            rules.execute_move(piece, destination, captured)
+    
+    return requests[:count]
+
+
+def run_client(socket_path, num_requests, seed):
+    requests = sample_requests(num_requests, seed)
+    agents = {}
+    latencies = []
+    
+    loop_started = time.perf_counter()
+    for color, state, actions in requests:
+        agent = agents.get(color)
+        if agent is None:
+            agent = agents[color] = RemoteAgent(color, socket_path)
+        
+        started = time.perf_counter()
+        agent.request(state, actions)
+        latencies.append(time.perf_counter() - started)
+    
+    loop_elapsed = time.perf_counter() - loop_started
+    
+    for agent in agents.values():
+        agent.close()
+    return latencies, loop_elapsed
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the inference server")
+    parser.add_argument("--socket", default="/tmp/checkers_inference.sock")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per client")
+    args = parser.parse_args()
+    
+    with multiprocessing.Pool(args.clients) as pool:
+        results = pool.starmap(run_client, [
+            (args.socket, args.requests, seed) for seed in range(args.clients)
+        ])
+    
+    latencies = sorted(latency for result, _ in results for latency in result)
+    total = len(latencies)
+    elapsed = max(loop_elapsed for _, loop_elapsed in results)
+    print(f"{total} requests from {args.clients} clients in {elapsed:.2f}s "
+          f"({total / elapsed:.0f} requests/sec)")
+    print(f"Latency ms: mean {sum(latencies) / total * 1000:.3f}, "
+          f"p50 {percentile(latencies, 0.5) * 1000:.3f}, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.3f}, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,29 @@
+import os
 import pygame
 import sys
+import threading
+import time
 
 from ui.home_screen import HomeScreen
 from ui.game_screen import GameScreen
 from game.board import Board
 from game.rules import Rules
-from ai.agent import LearningAgent
+from ai.agent_registry import AgentRegistry
+from ai.inference_server import RemoteAgent
+from ai.ponder import Ponderer
+from ai.memory_report import memory_report, append_report, format_report
 
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 700
 FPS = 60
 SAVE_DIR = "saved_models"
+LOG_DIR = "training_logs"
+AI_COLORS = ['black', 'blue', 'green', 'yellow']
+DIFFICULTIES = ['easy', 'normal', 'hard']
+AI_TIME_BUDGETS = {'easy': 0.1, 'normal': 0.5, 'hard': 1.5}
+AI_MIN_DELAY = 250
+INFERENCE_SOCKET = os.environ.get("CHECKERS_INFERENCE_SOCKET")
 
 
 class CheckersGame:
@@ -27,6 +39,9 @@ class CheckersGame:
         self.game_mode = None
         
         self.home_screen = HomeScreen(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.agent_registry = AgentRegistry(SAVE_DIR, AI_COLORS)
+        if not INFERENCE_SOCKET:
+            self.agent_registry.preload()
         self.game_screen = None
         
         self.board = None
@@ -34,6 +49,7 @@ class CheckersGame:
         self.players = []
         self.current_player_index = 0
         self.ai_players = {}
+        self.remote_agents = {}
         
         self.selected_piece = None
         self.valid_moves = {}
@@ -42,19 +58,17 @@ class CheckersGame:
         self.restart_button = None
         self.menu_button = None
         
-        self.ai_delay = 500
+        self.difficulty = 'normal'
+        self.home_screen.difficulty = self.difficulty
         self.ai_move_time = 0
-    
-    def _get_save_path(self, color):
-        return f"{SAVE_DIR}/agent_{color}.json"
+        self.ai_ready = None
+        self.ai_result = None
+        self.game_id = 0
+        self.ponderer = None
+        self.pondering = False
     
     def _save_all_agents(self):
-        for color, ai in self.ai_players.items():
-            ai.save(self._get_save_path(color))
-    
-    def _load_all_agents(self):
-        for color, ai in self.ai_players.items():
-            ai.load(self._get_save_path(color))
+        self.agent_registry.save_changed()
     
     def run(self):
         running = True
@@ -72,7 +86,10 @@ class CheckersGame:
             pygame.display.flip()
             self.clock.tick(FPS)
         
+        self._stop_pondering()
         self._save_all_agents()
+        for agent in self.remote_agents.values():
+            agent.close()
         pygame.quit()
         sys.exit()
     
@@ -91,12 +108,20 @@ class CheckersGame:
             self._start_game('classic')
         elif result == 'four_player':
             self._start_game('four_player')
+        elif result == 'difficulty':
+            index = DIFFICULTIES.index(self.difficulty)
+            self.difficulty = DIFFICULTIES[(index + 1) % len(DIFFICULTIES)]
+            self.home_screen.difficulty = self.difficulty
     
     def _handle_game_event(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
+                self._stop_pondering()
                 self.state = 'HOME'
                 return
+            if event.key == pygame.K_m:
+                self._report_memory()
+                return
         
         current_player = self.players[self.current_player_index]
         if current_player != 'red':
@@ -118,7 +143,10 @@ class CheckersGame:
             captured = self.valid_moves[(row, col)]
             was_king = self.selected_piece.is_king
             
-            self.rules.execute_move(self.selected_piece, (row, col), captured)
+            self._stop_pondering()
+            
+            self.rules.step((self.selected_piece, (row, col), captured), self.players,
+                            self._following_player())
             
             became_king = not was_king and self.selected_piece.is_king
             
@@ -130,11 +158,7 @@ class CheckersGame:
         
         elif clicked_piece and clicked_piece.color == 'red':
             self.selected_piece = clicked_piece
-            self.valid_moves = self.rules.get_valid_moves(clicked_piece)
-            
-            if self.rules.has_captures('red'):
-                if not any(self.valid_moves.values()):
-                    self.valid_moves = {}
+            self.valid_moves = self.rules.get_all_valid_moves('red').get(clicked_piece, {})
         
         else:
             self.selected_piece = None
@@ -152,7 +176,22 @@ class CheckersGame:
         if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
             self.state = 'HOME'
     
+    def _report_memory(self):
+        agents = list(self.agent_registry.loaded().values())
+        boards = [self.board] if self.board is not None else None
+        report = memory_report(agents, boards, census=True)
+        append_report(f"{LOG_DIR}/memory_ui.jsonl", report)
+        print(format_report(report))
+    
+    def _remote_agent(self, color):
+        agent = self.remote_agents.get(color)
+        if agent is None:
+            agent = self.remote_agents[color] = RemoteAgent(color, INFERENCE_SOCKET)
+        agent.reset()
+        return agent
+    
     def _start_game(self, mode):
+        self._stop_pondering()
         self.game_mode = mode
         self.state = 'PLAYING'
         
@@ -161,20 +200,21 @@ class CheckersGame:
             self.players = ['red', 'black']
             self.game_screen = GameScreen(SCREEN_WIDTH, SCREEN_HEIGHT, 8)
             
-            self.ai_players = {
-                'black': LearningAgent('black')
-            }
+            ai_colors = ['black']
         else:
             self.board = Board(12, 'four_player')
             self.players = ['red', 'blue', 'green', 'yellow']
             self.game_screen = GameScreen(SCREEN_WIDTH, SCREEN_HEIGHT, 12)
             self.game_screen.update_board_size(12)
             
-            self.ai_players = {
-                'blue': LearningAgent('blue'),
-                'green': LearningAgent('green'),
-                'yellow': LearningAgent('yellow')
-            }
+            ai_colors = ['blue', 'green', 'yellow']
+        
+        if INFERENCE_SOCKET:
+            agents = {color: self._remote_agent(color) for color in ai_colors}
+        else:
+            agents = self.agent_registry.get_many(ai_colors)
+        
+        self.ai_players = agents
         
         self.rules = Rules(self.board)
         self.current_player_index = 0
@@ -182,11 +222,10 @@ class CheckersGame:
         self.valid_moves = {}
         self.winner = None
         self.ai_move_time = 0
-        
-        self._load_all_agents()
-        
-        for ai in self.ai_players.values():
-            ai.reset()
+        self.ai_ready = None
+        self.ai_result = None
+        self.game_id += 1
+        self.ponderer = Ponderer(self.players, 'red', self.ai_players)
     
     def _update(self):
         if self.state != 'PLAYING':
@@ -194,6 +233,7 @@ class CheckersGame:
         
         game_over, winner = self.rules.is_game_over(self.players)
         if game_over:
+            self._stop_pondering()
             self.winner = winner
             self.state = 'GAME_OVER'
             self._save_all_agents()
@@ -201,30 +241,66 @@ class CheckersGame:
         
         current_player = self.players[self.current_player_index]
         if current_player in self.ai_players:
-            current_time = pygame.time.get_ticks()
-            
-            if self.ai_move_time == 0:
-                self.ai_move_time = current_time + self.ai_delay
-            elif current_time >= self.ai_move_time:
-                self._execute_ai_turn(current_player)
-                self.ai_move_time = 0
+            if self.ai_ready is None:
+                self._start_ai_turn(current_player)
+            elif self.ai_ready.is_set() and pygame.time.get_ticks() >= self.ai_move_time:
+                self.ai_ready = None
+                self._execute_ai_turn(current_player, self.ai_result)
+        elif not self.pondering:
+            self.ponderer.start(self.board, AI_TIME_BUDGETS[self.difficulty])
+            self.pondering = True
+    
+    def _stop_pondering(self):
+        if self.ponderer is not None:
+            self.ponderer.stop()
+        self.pondering = False
+    
+    def _start_ai_turn(self, color):
+        self.ai_move_time = pygame.time.get_ticks() + AI_MIN_DELAY
+        self.ai_result = None
+        self.ai_ready = threading.Event()
+        
+        cached = self.ponderer.lookup(self.board, color)
+        if cached is not None:
+            self.ai_result = cached
+            self.ai_ready.set()
+            return
+        
+        # The thinker gets its own board and Rules; the main thread keeps querying self.rules
+        board = self.board.copy()
+        deadline = time.perf_counter() + AI_TIME_BUDGETS[self.difficulty]
+        thread = threading.Thread(
+            target=self._think, args=(self.game_id, color, board, deadline, self.ai_ready),
+            daemon=True
+        )
+        thread.start()
     
-    def _execute_ai_turn(self, color):
+    def _think(self, game_id, color, board, deadline, ready):
+        move = self.ai_players[color].choose_move(board, Rules(board), deadline)
+        if game_id == self.game_id:
+            self.ai_result = move
+            ready.set()
+    
+    def _resolve_move(self, color, move):
+        piece, destination, _ = move
+        piece = self.board.get_piece(piece.row, piece.col)
+        return piece, destination, self.rules.get_all_valid_moves(color)[piece][destination]
+    
+    def _execute_ai_turn(self, color, move):
         ai = self.ai_players[color]
-        move = ai.choose_move(self.board, self.rules)
         
         if move is None:
             self._next_turn()
             return
         
+        move = self._resolve_move(color, move)
+        ai.record_choice(self.board, move)
         piece, destination, captured = move
         was_king = piece.is_king
         
-        self.rules.execute_move(piece, destination, captured)
+        game_over, winner, _ = self.rules.step(move, self.players, self._following_player())
         
         became_king = not was_king and piece.is_king
-        
-        game_over, winner = self.rules.is_game_over(self.players)
         won = winner == color
         reward = ai.calculate_reward(captured, became_king, game_over, won)
         ai.learn(self.board, reward)
@@ -234,6 +310,9 @@ class CheckersGame:
     def _process_move_result(self, captured, became_king):
         pass
     
+    def _following_player(self):
+        return self.players[(self.current_player_index + 1) % len(self.players)]
+    
     def _next_turn(self):
         self.current_player_index = (self.current_player_index + 1) % len(self.players)
         
@@ -242,10 +321,8 @@ class CheckersGame:
             current_player = self.players[self.current_player_index]
             pieces = self.board.get_all_pieces(current_player)
             
-            if pieces:
-                moves = self.rules.get_all_valid_moves(current_player)
-                if moves:
-                    break
+            if pieces and self.rules.has_moves(current_player):
+                break
             
             self.current_player_index = (self.current_player_index + 1) % len(self.players)
             attempts += 1
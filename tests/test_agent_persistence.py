@@ -0,0 +1,30 @@
+from ai.agent import DELTA_SUFFIX, LearningAgent
+
+
+def test_torn_delta_line_does_not_swallow_later_saves(tmp_path):
+    path = str(tmp_path / "agent_red.json")
+    
+    agent = LearningAgent("red")
+    agent.set_value((1, 0), (5, 0, 4, 1), 1.0)
+    agent.save(path)
+    agent.set_value((2, 0), (5, 2, 4, 3), 2.0)
+    agent.save(path)
+    
+    with open(path + DELTA_SUFFIX, "a") as f:
+        f.write('[[3, 0], [5, 4')
+    
+    agent = LearningAgent("red")
+    agent.load(path)
+    agent.set_value((4, 0), (5, 6, 4, 7), 4.0)
+    agent.save(path)
+    agent.set_value((5, 0), (6, 1, 5, 0), 5.0)
+    agent.save(path)
+    
+    reloaded = LearningAgent("red")
+    reloaded.load(path)
+    assert reloaded.value_table == {
+        ((1, 0), (5, 0, 4, 1)): 1.0,
+        ((2, 0), (5, 2, 4, 3)): 2.0,
+        ((4, 0), (5, 6, 4, 7)): 4.0,
+        ((5, 0), (6, 1, 5, 0)): 5.0,
+    }
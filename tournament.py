@@ -0,0 +1,314 @@
+import argparse
+import csv
+import importlib
+import math
+import multiprocessing
+import os
+import random
+import time
+from itertools import combinations
+
+from game.board import create_board
+from game.rules import Rules
+from ai.agent import LearningAgent
+from ai.search_agent import SearchAgent
+
+
+MODES = {
+    "classic": (8, ["red", "black"]),
+    "four_player": (12, ["red", "blue", "green", "yellow"]),
+}
+MAX_MOVES = 300
+PRIOR_DRAWS = 2
+
+
+class RandomPlayer:
+    
+    def __init__(self, color):
+        self.color = color
+    
+    def choose_move(self, board, rules):
+        return rules.random_move(self.color)
+    
+    def reset(self):
+        pass
+
+
+def build_agent(spec, color, players):
+    kind, _, arg = spec.partition(":")
+    
+    if kind == "random":
+        return RandomPlayer(color)
+    
+    if kind == "tabular":
+        path = arg
+        if os.path.isdir(path):
+            path = os.path.join(path, f"agent_{color}.json")
+        agent = LearningAgent(color, exploration_rate=0)
+        if not agent.load(path):
+            raise FileNotFoundError(f"No checkpoint at {path}")
+        return agent
+    
+    if kind == "search":
+        depth = int(arg) if arg else 3
+        return SearchAgent(LearningAgent(color, exploration_rate=0), players, default_depth=depth)
+    
+    module = importlib.import_module(kind)
+    return getattr(module, arg)(color)
+
+
+def seat_owners(pairing, num_seats, swapped):
+    first, second = pairing
+    if swapped:
+        first, second = second, first
+    return tuple(first if seat < num_seats // 2 else second for seat in range(num_seats))
+
+
+_tournament = None
+
+
+def _init_worker(specs, game_mode):
+    global _tournament
+    _tournament = (specs, game_mode, {})
+
+
+def _seat_agent(entrant, color, players):
+    specs, _, cache = _tournament
+    key = (entrant, color)
+    if key not in cache:
+        cache[key] = build_agent(specs[entrant], color, players)
+    return cache[key]
+
+
+def play_game(job):
+    owners, seed = job
+    _, game_mode, _ = _tournament
+    board_size, players = MODES[game_mode]
+    random.seed(seed)
+    
+    board = create_board(board_size, game_mode)
+    rules = Rules(board)
+    agents = [_seat_agent(owner, color, players) for owner, color in zip(owners, players)]
+    for agent in agents:
+        agent.reset()
+    
+    cpu = {owner: 0.0 for owner in owners}
+    moves = {owner: 0 for owner in owners}
+    winner_owner = None
+    current = 0
+    
+    for _ in range(MAX_MOVES):
+        game_over, winner = rules.is_game_over(players)
+        if game_over:
+            if winner is not None:
+                winner_owner = owners[players.index(winner)]
+            break
+        
+        owner = owners[current]
+        started = time.process_time()
+        move = agents[current].choose_move(board, rules)
+        cpu[owner] += time.process_time() - started
+        
+        if move is not None:
+            piece, destination, captured = move
+            rules.execute_move(piece, destination, captured)
+            moves[owner] += 1
+        
+        current = (current + 1) % len(players)
+    
+    return owners, winner_owner, cpu, moves
+
+
+class Tournament:
+    
+    def __init__(self, specs, game_mode="classic", num_workers=None, seed=0):
+        self.specs = list(specs)
+        self.game_mode = game_mode
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.seed = seed
+        self.num_seats = len(MODES[game_mode][1])
+        
+        n = len(self.specs)
+        self.wins = [[0.0] * n for _ in range(n)]
+        self.games = [[0] * n for _ in range(n)]
+        self.cpu = [0.0] * n
+        self.moves = [0] * n
+        self.games_played = 0
+    
+    def _jobs(self, pairings, games_per_pairing):
+        jobs = []
+        for pairing in pairings:
+            for game in range(games_per_pairing):
+                owners = seat_owners(pairing, self.num_seats, swapped=game % 2 == 1)
+                jobs.append((owners, self.seed + self.games_played + len(jobs)))
+        return jobs
+    
+    def _play(self, pool, jobs):
+        for owners, winner, cpu, moves in pool.imap_unordered(play_game, jobs):
+            first, second = sorted(set(owners))
+            self.games[first][second] += 1
+            self.games[second][first] += 1
+            
+            if winner is None:
+                self.wins[first][second] += 0.5
+                self.wins[second][first] += 0.5
+            else:
+                loser = second if winner == first else first
+                self.wins[winner][loser] += 1
+            
+            for owner in cpu:
+                self.cpu[owner] += cpu[owner]
+                self.moves[owner] += moves[owner]
+        
+        self.games_played += len(jobs)
+    
+    def round_robin(self, games_per_pairing=2):
+        pairings = list(combinations(range(len(self.specs)), 2))
+        with self._pool() as pool:
+            self._play(pool, self._jobs(pairings, games_per_pairing))
+        return self.standings()
+    
+    def swiss(self, rounds, games_per_pairing=2):
+        played = set()
+        with self._pool() as pool:
+            for _ in range(rounds):
+                pairings = self._swiss_pairings(played)
+                played.update(pairings)
+                self._play(pool, self._jobs(pairings, games_per_pairing))
+        return self.standings()
+    
+    def _swiss_pairings(self, played):
+        scores = [sum(row) for row in self.wins]
+        order = sorted(range(len(self.specs)), key=lambda i: scores[i], reverse=True)
+        
+        pairings = []
+        while len(order) > 1:
+            first = order.pop(0)
+            fresh = [o for o in order if tuple(sorted((first, o))) not in played]
+            partner = fresh[0] if fresh else order[0]
+            order.remove(partner)
+            pairings.append(tuple(sorted((first, partner))))
+        return pairings
+    
+    def _pool(self):
+        return multiprocessing.Pool(self.num_workers, initializer=_init_worker,
+                                    initargs=(self.specs, self.game_mode))
+    
+    def ratings(self, iterations=1000):
+        n = len(self.specs)
+        wins = [row[:] for row in self.wins]
+        games = [row[:] for row in self.games]
+        for i in range(n):
+            for j in range(n):
+                if i != j and games[i][j]:
+                    wins[i][j] += PRIOR_DRAWS / 2
+                    games[i][j] += PRIOR_DRAWS
+        
+        gamma = [1.0] * n
+        for _ in range(iterations):
+            previous = gamma[:]
+            for i in range(n):
+                total_wins = sum(wins[i])
+                denominator = sum(
+                    games[i][j] / (gamma[i] + gamma[j])
+                    for j in range(n) if j != i and games[i][j]
+                )
+                if denominator > 0 and total_wins > 0:
+                    gamma[i] = total_wins / denominator
+            
+            mean_log = sum(math.log(g) for g in gamma) / n
+            gamma = [g / math.exp(mean_log) for g in gamma]
+            if max(abs(a - b) for a, b in zip(gamma, previous)) < 1e-9:
+                break
+        
+        scale = 400 / math.log(10)
+        ratings = []
+        for i in range(n):
+            information = sum(
+                games[i][j] * gamma[i] * gamma[j] / (gamma[i] + gamma[j]) ** 2
+                for j in range(n) if j != i
+            )
+            error = 1.96 * scale / math.sqrt(information) if information else float("inf")
+            ratings.append((scale * math.log(gamma[i]), error))
+        return ratings
+    
+    def standings(self):
+        rows = []
+        for i, (elo, error) in enumerate(self.ratings()):
+            games = sum(self.games[i])
+            score = sum(self.wins[i])
+            rows.append({
+                "agent": self.specs[i],
+                "elo": round(elo, 1),
+                "error": round(error, 1),
+                "games": games,
+                "score": score / games * 100 if games else 0.0,
+                "cpu_seconds": round(self.cpu[i], 3),
+                "ms_per_move": (round(self.cpu[i] / self.moves[i] * 1000, 3)
+                                if self.moves[i] else 0.0),
+                "score_per_cpu_second": round(score / self.cpu[i], 1) if self.cpu[i] else 0.0,
+            })
+        rows.sort(key=lambda row: row["elo"], reverse=True)
+        return rows
+
+
+def format_standings(rows):
+    lines = [f"{'Agent':<32} {'Elo':>7} {'+/-':>6} {'Games':>6} {'Score':>7} "
+             f"{'CPU s':>8} {'ms/move':>8} {'pts/CPU s':>10}"]
+    for row in rows:
+        lines.append(
+            f"{row['agent']:<32} {row['elo']:>7.1f} {row['error']:>6.1f} {row['games']:>6} "
+            f"{row['score']:>6.1f}% {row['cpu_seconds']:>8.2f} {row['ms_per_move']:>8.3f} "
+            f"{row['score_per_cpu_second']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def write_results(rows, out_dir, game_mode):
+    if not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+    
+    csv_path = os.path.join(out_dir, f"standings_{game_mode}.csv")
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    
+    text_path = os.path.join(out_dir, f"standings_{game_mode}.txt")
+    with open(text_path, "w") as f:
+        f.write(format_standings(rows) + "\n")
+    
+    return csv_path, text_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank agents with a tournament")
+    parser.add_argument("agents", nargs="+",
+                        help="random, search:<depth>, tabular:<dir or agent_*.json>, "
+                             "or module:factory")
+    parser.add_argument("--mode", default="classic", choices=list(MODES))
+    parser.add_argument("--games", type=int, default=10,
+                        help="games per pairing, alternating seats")
+    parser.add_argument("--swiss", type=int, default=0, metavar="ROUNDS",
+                        help="play Swiss rounds instead of a full round robin")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="tournament_results")
+    args = parser.parse_args()
+    
+    tournament = Tournament(args.agents, args.mode, args.workers, args.seed)
+    start = time.perf_counter()
+    if args.swiss:
+        rows = tournament.swiss(args.swiss, args.games)
+    else:
+        rows = tournament.round_robin(args.games)
+    elapsed = time.perf_counter() - start
+    
+    print(format_standings(rows))
+    print(f"{tournament.games_played} games in {elapsed:.1f}s")
+    for path in write_results(rows, args.out, args.mode):
+        print(f"Saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
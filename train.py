@@ -1,15 +1,47 @@
+import argparse
+import multiprocessing
+import os
+import random
 import sys
+import time
+import tracemalloc
+from functools import partial
 
-from game.board import Board
+from game.board import create_board
 from game.rules import Rules
+from game.record import GameRecord, GameRecordWriter
 from ai.agent import LearningAgent
+from ai.inference_server import RemoteAgent
+from ai.memory_report import memory_report
+from ai.packed_table import PackedValueTable
+from ai.profiler import TrainingProfiler
+from ai.shared_table import SharedValueTable
+from ai.sqlite_table import SQLiteValueTable
 from ai.training_logger import TrainingLogger
 
 
+EXPLORATION_DECAY_GAMES = 5000
+
 class SelfPlayTrainer:
     
-    def __init__(self, game_mode="classic", log_dir="training_logs"):
+    def __init__(self, game_mode="classic", log_dir="training_logs",
+                 value_store="memory", store_dir="saved_models", value_tables=None,
+                 record_path=None, board_backend="list", max_moves=500,
+                 repetition_limit=3, no_progress_limit=80, adjudication_margin=None,
+                 track_memory=False, metrics_port=None):
         self.game_mode = game_mode
+        self.track_memory = track_memory
+        self.metrics_port = metrics_port
+        self.phase_seconds = {"choose": 0.0, "execute": 0.0, "learn": 0.0}
+        self.table_entries = {}
+        self.max_moves = max_moves
+        self.repetition_limit = repetition_limit
+        self.no_progress_limit = no_progress_limit
+        self.adjudication_margin = adjudication_margin
+        self.board_backend = board_backend
+        self.value_store = value_store
+        self.store_dir = store_dir
+        self.value_tables = value_tables or {}
         self.logger = TrainingLogger(log_dir)
         
         if game_mode == "classic":
@@ -25,34 +57,92 @@ class SelfPlayTrainer:
                 color,
                 learning_rate=0.1,
                 discount_factor=0.95,
-                exploration_rate=0.3
+                exploration_rate=0.3,
+                value_table=self._create_value_table(color)
             )
         
         self.baseline_agent = RandomAgent()
+        
+        self.record_writer = None
+        if record_path:
+            self.record_writer = GameRecordWriter(record_path)
+    
+    def _create_value_table(self, color):
+        if color in self.value_tables:
+            return self.value_tables[color]
+        if self.value_store == "sqlite":
+            path = os.path.join(self.store_dir, f"agent_{color}.sqlite")
+            return SQLiteValueTable(path)
+        if self.value_store == "packed":
+            return PackedValueTable(self.board_size)
+        if self.value_store == "packed_half":
+            return PackedValueTable(self.board_size, value_format="half")
+        return None
     
-    def train(self, num_games=1000, save_interval=1000, verbose=True):
+    def train(self, num_games=1000, save_interval=1000, verbose=True, profiler=None,
+              decay_interval=EXPLORATION_DECAY_GAMES):
         if verbose:
             print(f"Starting training: {num_games} games")
             print(f"Game mode: {self.game_mode}")
             print("-" * 50)
         
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        
+        if self.metrics_port is not None and self.logger.metrics_server is None:
+            port = self.logger.start_metrics_server(self.metrics_port)
+            if verbose:
+                print(f"Metrics: http://127.0.0.1:{port}/metrics")
+        
         for game_num in range(1, num_games + 1):
+            if profiler:
+                profiler.before_game(game_num, self.logger.valid_move_count)
+            
             self.play_game()
             
+            if self.logger.metrics_due():
+                self._publish_metrics()
+            
+            if profiler and profiler.after_game(game_num, self.logger.valid_move_count):
+                if verbose:
+                    print(profiler.summary())
+            
             if game_num % save_interval == 0:
+                if profiler:
+                    profiler.pause()
+                
                 self.logger.save_all()
+                self._flush_value_tables()
+                self._count_table_entries(include_persistent=True)
+                report = memory_report(self.ai_agents.values(), census=self.track_memory)
+                self.logger.log_memory(report)
                 
                 if verbose:
                     stats = self.logger.get_stats()
                     print(f"Game {game_num}/{num_games}")
                     print(f"  Win rates: {self._format_win_rates(stats)}")
                     print(f"  Avg moves/game: {stats['avg_moves_per_game']:.1f}")
+                    print(f"  Memory: {(report['rss_bytes'] or 0) / 1e6:.1f} MB RSS, "
+                          f"{sum(a['entries'] for a in report['agents'])} table entries")
+                
+                if profiler:
+                    profiler.resume()
             
-            if game_num % 5000 == 0:
-                for agent in self.ai_agents.values():
-                    agent.exploration_rate = max(0.05, agent.exploration_rate * 0.9)
+            self.decay_exploration(game_num, decay_interval)
+        
+        if profiler and profiler.active:
+            profiler.finish(self.logger.valid_move_count)
+            if verbose:
+                print(profiler.summary())
         
         self.logger.save_all()
+        self._flush_value_tables()
+        if self.record_writer:
+            self.record_writer.flush()
+        
+        if self.logger.metrics_server is not None:
+            self._count_table_entries(include_persistent=True)
+            self._publish_metrics()
         
         if verbose:
             print("-" * 50)
@@ -63,29 +153,64 @@ class SelfPlayTrainer:
         
         return self.logger.get_stats()
     
+    def decay_exploration(self, game_num, interval=EXPLORATION_DECAY_GAMES):
+        if game_num % interval == 0:
+            for agent in self.ai_agents.values():
+                agent.exploration_rate = max(0.05, agent.exploration_rate * 0.9)
+    
+    def _count_table_entries(self, include_persistent=False):
+        for color, agent in self.ai_agents.items():
+            if include_persistent or not agent.persistent_table:
+                self.table_entries[color] = len(agent.value_table)
+    
+    def _publish_metrics(self):
+        self._count_table_entries()
+        exploration_rates = {
+            color: agent.exploration_rate for color, agent in self.ai_agents.items()
+        }
+        self.logger.publish_metrics(exploration_rates, dict(self.table_entries),
+                                    dict(self.phase_seconds))
+    
+    def _flush_value_tables(self):
+        for agent in self.ai_agents.values():
+            if agent.persistent_table:
+                agent.value_table.flush()
+    
     def play_game(self):
-        board = Board(self.board_size, self.game_mode)
+        board = create_board(self.board_size, self.game_mode, self.board_backend)
         rules = Rules(board)
         
+        seed = None
+        rng = random
+        if self.record_writer is not None:
+            seed = random.getrandbits(32)
+            rng = random.Random(seed)
+        moves = []
+        
         self.logger.start_game()
         
         for agent in self.ai_agents.values():
             agent.reset()
+            agent.rng = rng
         
         current_player_idx = 0
-        max_moves = 500
         move_count = 0
+        no_progress = 0
+        history = {}
         
-        while move_count < max_moves:
+        while move_count < self.max_moves:
             current_color = self.players[current_player_idx]
             
             game_over, winner = rules.is_game_over(self.players)
             if game_over:
-                self._end_game(winner, rules)
+                self._end_game(winner, rules, seed, moves, 'game_over')
                 return
             
             agent = self.ai_agents[current_color]
+            started = time.perf_counter()
             move = agent.choose_move(rules.board, rules)
+            chosen = time.perf_counter()
+            self.phase_seconds["choose"] += chosen - started
             
             if move is None:
                 current_player_idx = (current_player_idx + 1) % len(self.players)
@@ -93,34 +218,87 @@ class SelfPlayTrainer:
             
             piece, destination, captured = move
             was_king = piece.is_king
+            moves.append(((piece.row, piece.col), destination, len(captured)))
             
-            rules.execute_move(piece, destination, captured)
+            next_color = self.players[(current_player_idx + 1) % len(self.players)]
+            game_over, winner, _ = rules.step(move, self.players, next_color)
             
             became_king = not was_king and piece.is_king
-            
-            game_over, winner = rules.is_game_over(self.players)
             won = winner == current_color
+            executed = time.perf_counter()
+            self.phase_seconds["execute"] += executed - chosen
             
             reward = agent.calculate_reward(captured, became_king, game_over, won)
             agent.learn(rules.board, reward)
+            self.phase_seconds["learn"] += time.perf_counter() - executed
             
             self.logger.log_move(current_color)
             
             if game_over:
-                self._end_game(winner, rules)
+                self._end_game(winner, rules, seed, moves, 'game_over')
                 return
             
             current_player_idx = (current_player_idx + 1) % len(self.players)
             move_count += 1
+            
+            progress = captured or not was_king
+            if progress:
+                no_progress = 0
+            else:
+                no_progress += 1
+            
+            reason = None
+            if self.repetition_limit:
+                if progress:
+                    history.clear()
+                position = hash((rules.board.get_state_key(), current_player_idx))
+                history[position] = history.get(position, 0) + 1
+                if history[position] >= self.repetition_limit:
+                    reason = 'repetition'
+            if reason is None and self.no_progress_limit and no_progress >= self.no_progress_limit:
+                reason = 'no_progress'
+            
+            if reason is not None:
+                self._finish_drawn_game(rules, seed, moves, reason)
+                return
         
-        self.logger.end_game(None)
+        self._finish_drawn_game(rules, seed, moves, 'max_moves')
     
-    def _end_game(self, winner, rules):
-        for color, agent in self.ai_agents.items():
-            if color != winner:
-                agent.learn(rules.board, -50)
+    def _finish_drawn_game(self, rules, seed, moves, reason):
+        if self.adjudication_margin is not None:
+            leader = self._material_leader(rules.board)
+            if leader is not None:
+                self._end_game(leader, rules, seed, moves, 'adjudicated')
+                return
         
-        self.logger.end_game(winner)
+        self._end_game(None, rules, seed, moves, reason)
+    
+    def _material_leader(self, board):
+        material = {}
+        for color in self.players:
+            pieces = board.get_all_pieces(color)
+            material[color] = len(pieces) + sum(1 for p in pieces if p.is_king)
+        
+        ranked = sorted(material, key=material.get, reverse=True)
+        if material[ranked[0]] - material[ranked[1]] >= self.adjudication_margin:
+            return ranked[0]
+        return None
+    
+    def _record_game(self, seed, moves, winner, reason):
+        if self.record_writer is None:
+            return
+        
+        record = GameRecord(self.game_mode, seed, self.players, moves, winner, reason)
+        self.record_writer.write(record)
+    
+    def _end_game(self, winner, rules, seed, moves, reason):
+        if reason in ('game_over', 'adjudicated'):
+            for color, agent in self.ai_agents.items():
+                if color != winner:
+                    agent.learn(rules.board, -50)
+        
+        self.logger.end_game(winner, reason)
+        self._record_game(seed, moves, winner, reason)
     
     def _format_win_rates(self, stats):
         rates = []
@@ -130,94 +308,299 @@ class SelfPlayTrainer:
                 rates.append(f"{color}:{rate:.1f}%")
         return " | ".join(rates)
     
-    def evaluate_against_random(self, num_games=100):
-        wins = 0
+    def evaluate_against_random(self, num_games=1000, num_workers=None, seed=0,
+                                tolerance=0.02, min_games=200, max_moves=300,
+                                inference_socket=None):
+        if inference_socket:
+            snapshots = {color: inference_socket for color in self.players}
+        else:
+            snapshots = {
+                color: self._frozen_table(agent.value_table)
+                for color, agent in self.ai_agents.items()
+            }
+        num_workers = num_workers or multiprocessing.cpu_count()
+        jobs = [(seed + game, self.players[game % len(self.players)])
+                for game in range(num_games)]
         
-        for _ in range(num_games):
-            board = Board(self.board_size, self.game_mode)
-            rules = Rules(board)
-            
-            trained_color = "black"
-            random_color = "red"
-            
-            trained_agent = self.ai_agents[trained_color]
-            trained_agent.exploration_rate = 0
-            trained_agent.reset()
-            
-            current_player_idx = 0
-            players = [random_color, trained_color]
-            max_moves = 300
-            move_count = 0
-            
-            while move_count < max_moves:
-                current_color = players[current_player_idx]
-                
-                game_over, winner = rules.is_game_over(players)
-                if game_over:
-                    if winner == trained_color:
-                        wins += 1
-                    break
-                
-                if current_color == trained_color:
-                    move = trained_agent.choose_move(board, rules)
-                else:
-                    move = self.baseline_agent.choose_move(board, rules, random_color)
-                
-                if move is None:
-                    current_player_idx = (current_player_idx + 1) % 2
-                    continue
-                
-                piece, destination, captured = move
-                rules.execute_move(piece, destination, captured)
+        results = {color: [0, 0, 0] for color in self.players}
+        played = 0
+        
+        init_args = (snapshots, self.game_mode, self.board_size, self.players,
+                     self.board_backend, max_moves)
+        if num_workers <= 1:
+            _init_evaluation(*init_args)
+            outcomes = map(_evaluate_game, jobs)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(num_workers, initializer=_init_evaluation,
+                                        initargs=init_args)
+            outcomes = pool.imap(_evaluate_game, jobs, chunksize=4)
+        
+        try:
+            for trained_color, outcome in outcomes:
+                results[trained_color][outcome] += 1
+                played += 1
                 
-                current_player_idx = (current_player_idx + 1) % 2
-                move_count += 1
+                if played >= min_games and played % len(self.players) == 0:
+                    wins = sum(r[0] for r in results.values())
+                    low, high = wilson_interval(wins, played)
+                    if (high - low) / 2 <= tolerance:
+                        break
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
         
-        win_rate = wins / num_games * 100
-        return win_rate
+        return self._evaluation_summary(results, played)
+    
+    def _frozen_table(self, table):
+        if isinstance(table, dict):
+            return dict(table)
+        if isinstance(table, PackedValueTable):
+            return table.copy()
+        if isinstance(table, SharedValueTable):
+            return table
+        if isinstance(table, SQLiteValueTable):
+            table.flush()
+            return partial(SQLiteValueTable, table.path, read_only=True)
+        return dict(table.items())
+    
+    def _evaluation_summary(self, results, played):
+        wins = sum(r[0] for r in results.values())
+        low, high = wilson_interval(wins, played)
+        
+        by_color = {}
+        for color, (color_wins, draws, losses) in results.items():
+            games = color_wins + draws + losses
+            color_low, color_high = wilson_interval(color_wins, games)
+            by_color[color] = {
+                "games": games,
+                "wins": color_wins,
+                "draws": draws,
+                "win_rate": color_wins / games * 100 if games else 0.0,
+                "ci": (color_low * 100, color_high * 100),
+            }
+        
+        return {
+            "games": played,
+            "wins": wins,
+            "draws": sum(r[1] for r in results.values()),
+            "win_rate": wins / played * 100 if played else 0.0,
+            "ci": (low * 100, high * 100),
+            "by_color": by_color,
+        }
 
 
-class RandomAgent:
+def wilson_interval(successes, trials, z=1.96):
+    if trials == 0:
+        return 0.0, 1.0
     
-    def choose_move(self, board, rules, color):
-        import random
-        all_moves = rules.get_all_valid_moves(color)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * ((p * (1 - p) + z * z / (4 * trials)) / trials) ** 0.5 / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+_evaluation = None
+
+
+def _init_evaluation(snapshots, game_mode, board_size, players, board_backend, max_moves):
+    global _evaluation
+    agents = {}
+    for color, table in snapshots.items():
+        if isinstance(table, str):
+            agents[color] = RemoteAgent(color, table)
+        elif callable(table):
+            agents[color] = LearningAgent(color, exploration_rate=0, value_table=table())
+        else:
+            agents[color] = LearningAgent(color, exploration_rate=0, value_table=table)
+    _evaluation = (agents, game_mode, board_size, players, board_backend, max_moves)
+
+
+def _evaluate_game(job):
+    seed, trained_color = job
+    agents, game_mode, board_size, players, board_backend, max_moves = _evaluation
+    rng = random.Random(seed)
+    
+    board = create_board(board_size, game_mode, board_backend)
+    rules = Rules(board)
+    trained_agent = agents[trained_color]
+    trained_agent.reset()
+    trained_agent.rng = rng
+    baseline = RandomAgent(rng)
+    
+    current_player_idx = 0
+    move_count = 0
+    
+    while move_count < max_moves:
+        current_color = players[current_player_idx]
         
-        if not all_moves:
-            return None
+        game_over, winner = rules.is_game_over(players)
+        if game_over:
+            if winner is None:
+                return trained_color, 1
+            return trained_color, 0 if winner == trained_color else 2
         
-        move_list = []
-        for piece, destinations in all_moves.items():
-            for dest, captured in destinations.items():
-                move_list.append((piece, dest, captured))
+        if current_color == trained_color:
+            move = trained_agent.choose_move(board, rules)
+        else:
+            move = baseline.choose_move(board, rules, current_color)
         
-        if not move_list:
-            return None
+        if move is None:
+            current_player_idx = (current_player_idx + 1) % len(players)
+            continue
         
-        return random.choice(move_list)
+        current_player_idx = (current_player_idx + 1) % len(players)
+        rules.step(move, players, players[current_player_idx])
+        move_count += 1
+    
+    return trained_color, 1
+
+
+def _parallel_worker(game_mode, log_dir, value_tables, num_games, seed, decay_interval,
+                     results):
+    random.seed(seed)
+    trainer = SelfPlayTrainer(game_mode=game_mode, log_dir=log_dir, value_tables=value_tables)
+    stats = trainer.train(num_games=num_games, save_interval=num_games, verbose=False,
+                          decay_interval=decay_interval)
+    stats["exploration_rates"] = {
+        color: agent.exploration_rate for color, agent in trainer.ai_agents.items()
+    }
+    results.put(stats)
+
+
+def train_parallel(num_workers, games_per_worker, game_mode="classic",
+                   log_dir="training_logs", capacity=1 << 20):
+    if game_mode == "classic":
+        players = ["red", "black"]
+        board_size = 8
+    else:
+        players = ["red", "blue", "green", "yellow"]
+        board_size = 12
+    
+    value_tables = {
+        color: SharedValueTable(board_size, capacity=capacity) for color in players
+    }
+    
+    # Workers play side by side, so each decays exploration on its share of the schedule
+    decay_interval = max(1, EXPLORATION_DECAY_GAMES // num_workers)
+    results = multiprocessing.Queue()
+    workers = []
+    for worker_id in range(num_workers):
+        worker_log_dir = os.path.join(log_dir, f"worker_{worker_id}")
+        workers.append(multiprocessing.Process(
+            target=_parallel_worker,
+            args=(game_mode, worker_log_dir, value_tables, games_per_worker, worker_id,
+                  decay_interval, results)
+        ))
+    
+    for worker in workers:
+        worker.start()
+    worker_stats = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    
+    stats = {
+        "games_played": sum(s["games_played"] for s in worker_stats),
+        "total_wins": {
+            color: sum(s["total_wins"][color] for s in worker_stats)
+            for color in worker_stats[0]["total_wins"]
+        },
+        "valid_move_count": sum(s["valid_move_count"] for s in worker_stats),
+        "exploration_rates": worker_stats[0]["exploration_rates"],
+    }
+    stats["avg_moves_per_game"] = stats["valid_move_count"] / max(1, stats["games_played"])
+    return value_tables, stats
+
+
+class RandomAgent:
+    
+    def __init__(self, rng=random):
+        self.rng = rng
+    
+    def choose_move(self, board, rules, color):
+        return rules.random_move(color, self.rng)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Checkers self-play trainer")
+    parser.add_argument("num_games", nargs="?", type=int, default=50000)
+    parser.add_argument("num_workers", nargs="?", type=int, default=1)
+    parser.add_argument("--value-store", default="memory",
+                        choices=["memory", "sqlite", "packed", "packed_half"],
+                        help="value table backend for single-process training")
+    parser.add_argument("--track-memory", action="store_true",
+                        help="trace allocations so memory reports include top allocation sites")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve live Prometheus metrics on this local port")
+    parser.add_argument("--evaluate-served", metavar="SOCKET", default=None,
+                        help="skip training and evaluate the agents served on this socket")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile a window of games and write pstats and collapsed stacks")
+    parser.add_argument("--profile-skip", type=int, default=100,
+                        help="warm-up games to play before profiling starts")
+    parser.add_argument("--profile-games", type=int, default=200,
+                        help="number of games to profile")
+    parser.add_argument("--profile-out", default="training_logs/profile",
+                        help="output path prefix for .prof, .folded and .txt files")
+    return parser.parse_args(argv)
 
 
 def main():
+    args = parse_args(sys.argv[1:])
+    
     print("=" * 60)
     print("CHECKERS REINFORCEMENT LEARNING TRAINER")
     print("=" * 60)
     print()
     
-    num_games = 50000
-    if len(sys.argv) > 1:
-        num_games = int(sys.argv[1])
+    num_games = args.num_games
+    num_workers = args.num_workers
     
-    trainer = SelfPlayTrainer(game_mode="classic")
+    profiler = None
+    if args.profile:
+        if num_workers > 1:
+            print("Profiling runs in a single process; ignoring worker count")
+            num_workers = 1
+        profiler = TrainingProfiler(args.profile_skip, args.profile_games, args.profile_out)
     
-    print("Phase 1: Self-Play Training")
-    print("-" * 40)
-    stats = trainer.train(num_games=num_games, save_interval=5000, verbose=True)
+    value_tables = {}
+    if args.evaluate_served:
+        print(f"Evaluating agents served on {args.evaluate_served}")
+        trainer = SelfPlayTrainer(game_mode="classic")
+    elif num_workers > 1:
+        print("Phase 1: Self-Play Training")
+        print("-" * 40)
+        print(f"Running {num_workers} worker processes on shared value tables")
+        value_tables, stats = train_parallel(num_workers, num_games // num_workers)
+        trainer = SelfPlayTrainer(game_mode="classic", value_tables=value_tables)
+        for color, agent in trainer.ai_agents.items():
+            agent.exploration_rate = stats["exploration_rates"][color]
+        print(f"Total games: {stats['games_played']}")
+        print(f"Final win rates: {trainer._format_win_rates(stats)}")
+    else:
+        print("Phase 1: Self-Play Training")
+        print("-" * 40)
+        trainer = SelfPlayTrainer(game_mode="classic", value_store=args.value_store,
+                                  track_memory=args.track_memory,
+                                  metrics_port=args.metrics_port)
+        stats = trainer.train(num_games=num_games, save_interval=5000, verbose=True,
+                              profiler=profiler)
     
     print()
     print("Phase 2: Evaluation Against Random Baseline")
     print("-" * 40)
-    win_rate = trainer.evaluate_against_random(num_games=1000)
-    print(f"Win rate against random: {win_rate:.1f}%")
+    result = trainer.evaluate_against_random(num_games=1000,
+                                             inference_socket=args.evaluate_served)
+    low, high = result["ci"]
+    print(f"Win rate against random: {result['win_rate']:.1f}% "
+          f"(95% CI {low:.1f}-{high:.1f}%, {result['games']} games)")
+    for color, stats in result["by_color"].items():
+        print(f"  as {color}: {stats['win_rate']:.1f}% over {stats['games']} games")
+    
+    for table in value_tables.values():
+        table.unlink()
     
     print()
     print("Training logs saved to: training_logs/")
@@ -30,6 +30,7 @@ class HomeScreen:
         )
         
         self.hovered_panel = None
+        self.difficulty = 'normal'
         
         self.title_font = None
         self.label_font = None
@@ -51,6 +52,10 @@ class HomeScreen:
             else:
                 self.hovered_panel = None
         
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_d:
+                return 'difficulty'
+        
         elif event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:
                 mouse_pos = event.pos
@@ -89,6 +94,13 @@ class HomeScreen:
             "Expanded board with three AI opponents",
             self.hovered_panel == 'four_player'
         )
+        
+        difficulty_text = self.desc_font.render(
+            f"AI difficulty: {self.difficulty.upper()} (press D to change)", True, TEXT_ACCENT
+        )
+        difficulty_rect = difficulty_text.get_rect(centerx=self.screen_width // 2,
+                                                   bottom=self.screen_height - 20)
+        screen.blit(difficulty_text, difficulty_rect)
     
     def _draw_panel(self, screen, rect, title, description, is_hovered):
         if is_hovered: